@@ -0,0 +1,176 @@
+"""
+Compares frontier implementations on a breadth-first shortest_path.
+
+Usage: python benchmark.py [directory] [pairs] [seed]
+
+Loads the CSV files into the dictionaries the original degrees.py used,
+runs the same random (source, target) pairs through its Node and frontier
+based shortest_path once per frontier, and reports explored nodes per
+second for each.
+"""
+
+import csv
+import random
+import sys
+import time
+
+from util import Node, QueueFrontier, DequeQueueFrontier
+
+# Maps person_ids to a dictionary of: name, birth, movies (a set of movie_ids)
+people = {}
+
+# Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
+movies = {}
+
+
+def load_data(directory):
+    """
+    Load data from CSV files into memory.
+
+    Star rows naming an unknown person or movie are skipped.
+    """
+    # Load people
+    with open(f"{directory}/people.csv", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            people[row["id"]] = {
+                "name": row["name"],
+                "birth": row["birth"],
+                "movies": set()
+            }
+
+    # Load movies
+    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            movies[row["id"]] = {
+                "title": row["title"],
+                "year": row["year"],
+                "stars": set()
+            }
+
+    # Load stars
+    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            # Check both ids before linking either way, so that a bad row
+            # leaves no dangling half of an edge behind
+            if (row["person_id"] not in people
+                    or row["movie_id"] not in movies):
+                continue
+            people[row["person_id"]]["movies"].add(row["movie_id"])
+            movies[row["movie_id"]]["stars"].add(row["person_id"])
+
+
+def shortest_path(source, target, frontier_class=DequeQueueFrontier):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target.
+
+    If no possible path, returns None.
+
+    `frontier_class` must be a breadth-first frontier; it defaults to the
+    deque-backed one, whose add, remove and contains_state are all O(1).
+    """
+    if source == target:
+        return []
+
+    start = Node(state=source, parent=None, action=None)
+    frontier = frontier_class()
+    frontier.add(start)
+
+    explored = set()
+
+    while True:
+
+        if frontier.empty():
+            return None
+
+        node = frontier.remove()
+
+        explored.add(node.state)
+
+        for movie_id, actor_id in neighbors_for_person(node.state):
+            if (not frontier.contains_state(actor_id)
+                    and actor_id not in explored):
+                child = Node(state=actor_id, parent=node, action=movie_id)
+
+                if child.state == target:
+                    path = []
+                    node = child
+
+                    while node.parent is not None:
+                        path.append((node.action, node.state))
+                        node = node.parent
+
+                    path.reverse()
+
+                    return path
+
+                frontier.add(child)
+
+
+def neighbors_for_person(person_id):
+    """
+    Returns (movie_id, person_id) pairs for people
+    who starred with a given person.
+    """
+    movie_ids = people[person_id]["movies"]
+    neighbors = set()
+    for movie_id in movie_ids:
+        for person_id in movies[movie_id]["stars"]:
+            neighbors.add((movie_id, person_id))
+    return neighbors
+
+
+def counting(frontier_class):
+    """
+    Returns a subclass of `frontier_class` that counts removed nodes.
+    """
+    class CountingFrontier(frontier_class):
+        removed = 0
+
+        def remove(self):
+            CountingFrontier.removed += 1
+            return super().remove()
+
+    CountingFrontier.__name__ = frontier_class.__name__
+    return CountingFrontier
+
+
+def run(frontier_class, pairs):
+    """
+    Returns (explored nodes, seconds) for answering every pair.
+    """
+    frontier_class = counting(frontier_class)
+    start = time.perf_counter()
+    for source, target in pairs:
+        shortest_path(source, target, frontier_class=frontier_class)
+    return frontier_class.removed, time.perf_counter() - start
+
+
+def main():
+    if len(sys.argv) > 4:
+        sys.exit("Usage: python benchmark.py [directory] [pairs] [seed]")
+    directory = sys.argv[1] if len(sys.argv) > 1 else "large"
+    num_pairs = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+
+    print("Loading data...")
+    load_data(directory)
+    print("Data loaded.")
+
+    rng = random.Random(seed)
+    person_ids = sorted(people)
+    pairs = [(rng.choice(person_ids), rng.choice(person_ids))
+             for _ in range(num_pairs)]
+
+    for frontier_class in (QueueFrontier, DequeQueueFrontier):
+        explored, seconds = run(frontier_class, pairs)
+        rate = explored / seconds if seconds else float("inf")
+        print(f"{frontier_class.__name__:>20}: {explored} nodes explored "
+              f"in {seconds:.3f}s ({rate:,.0f} nodes/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Connected components and degree statistics for the degrees graph.
+
+Usage: python components.py [directory]
+
+Components are labelled with a union-find pass over the stars of each
+movie, which is linear in the size of the graph, and saved next to the CSV
+files so that whether two people are connected, and how many people one
+can reach, are known before any search runs. The report prints component
+sizes, degree histograms and eccentricity estimates for the largest
+component.
+"""
+
+import argparse
+import os
+from array import array
+from collections import Counter
+
+import graph as csr
+import snapshot
+
+COMPONENTS_NAME = "components.index"
+COMPONENTS_VERSION = 1
+
+
+class Components():
+    """
+    Component id of every person, and the size of every component.
+    """
+
+    def __init__(self, labels, sizes):
+        self.labels = labels
+        self.sizes = sizes
+
+    def connected(self, person, other):
+        """
+        Returns True if there is any path between the two people.
+        """
+        return self.labels[person] == self.labels[other]
+
+    def reachable(self, person):
+        """
+        Returns how many people (including `person`) `person` can reach.
+        """
+        return self.sizes[self.labels[person]]
+
+
+def find(parents, person):
+    """
+    Returns the root of `person`'s set, halving the path on the way.
+    """
+    while parents[person] != person:
+        parents[person] = parents[parents[person]]
+        person = parents[person]
+    return person
+
+
+def label_components(graph):
+    """
+    Returns the Components of `graph`, found by union-find.
+
+    Every movie joins all of its stars into one set. Component ids are
+    numbered from 0 in order of their lowest person index.
+    """
+    parents = array("i", range(graph.num_people))
+    sizes = array("i", [1]) * graph.num_people
+    for movie in range(graph.num_movies):
+        stars = graph.stars_for_movie(movie)
+        if not len(stars):
+            continue
+        root = find(parents, stars[0])
+        for star in stars[1:]:
+            other = find(parents, star)
+            if other == root:
+                continue
+            if sizes[other] > sizes[root]:
+                root, other = other, root
+            parents[other] = root
+            sizes[root] += sizes[other]
+
+    labels = array("i", [-1]) * graph.num_people
+    component_sizes = array("i")
+    for person in range(graph.num_people):
+        root = find(parents, person)
+        if labels[root] == -1:
+            labels[root] = len(component_sizes)
+            component_sizes.append(sizes[root])
+        labels[person] = labels[root]
+    return Components(labels, component_sizes)
+
+
+def load_components(directory, graph):
+    """
+    Returns the Components for `directory`, memory-mapped from disk when
+    they are up to date, or labelled from `graph` and saved otherwise.
+    """
+    path = os.path.join(directory, COMPONENTS_NAME)
+    key = dict(snapshot.snapshot_key(directory),
+               components_version=COMPONENTS_VERSION)
+    header, sections = snapshot.read_sections(path)
+    if header is not None and header.get("key") == key:
+        return Components(sections["labels"], sections["sizes"])
+
+    components = label_components(graph)
+    try:
+        snapshot.write_sections(path, {"key": key}, {
+            "labels": components.labels,
+            "sizes": components.sizes,
+        })
+    except OSError:
+        pass
+    return components
+
+
+def eccentricity(graph, person):
+    """
+    Returns (eccentricity of `person`, a person that far away).
+    """
+    distances = csr.distances_from(graph, person)
+    farthest = max(range(len(distances)), key=distances.__getitem__)
+    return distances[farthest], farthest
+
+
+def histogram(values):
+    """
+    Returns [(low, high, count)] bucketing `values` by powers of two.
+    """
+    buckets = Counter(value.bit_length() for value in values)
+    return [(0 if bits == 0 else 1 << (bits - 1), (1 << bits) - 1,
+             buckets[bits])
+            for bits in sorted(buckets)]
+
+
+def report(graph, components):
+    """
+    Prints component sizes, degree histograms and eccentricity estimates.
+    """
+    sizes = Counter(components.sizes)
+    print(f"{graph.num_people} people, {graph.num_movies} movies, "
+          f"{len(components.sizes)} components")
+    print("Component sizes:")
+    for size, count in sorted(sizes.items(), reverse=True)[:10]:
+        print(f"    {size:>10} people: {count} components")
+
+    movie_counts = [len(graph.movies_for_person(person))
+                    for person in range(graph.num_people)]
+    link_counts = [sum(len(graph.stars_for_movie(movie)) - 1
+                       for movie in graph.movies_for_person(person))
+                   for person in range(graph.num_people)]
+    for title, values in (("Movies per person:", movie_counts),
+                          ("Co-star links per person:", link_counts)):
+        print(title)
+        for low, high, count in histogram(values):
+            print(f"    {low:>7} - {high:<7} {count}")
+
+    if not len(components.sizes):
+        return
+
+    # Double sweep: the person farthest from a hub is usually close to the
+    # periphery, so its eccentricity is a good lower bound on the diameter
+    largest = max(range(len(components.sizes)),
+                  key=components.sizes.__getitem__)
+    hub = max((person for person in range(graph.num_people)
+               if components.labels[person] == largest),
+              key=link_counts.__getitem__)
+    hub_eccentricity, peripheral = eccentricity(graph, hub)
+    diameter, _ = eccentricity(graph, peripheral)
+    print("Largest component:")
+    print(f"    {components.sizes[largest]} people")
+    print(f"    eccentricity of {graph.person_names[hub]}: {hub_eccentricity}")
+    print(f"    diameter: between {diameter} and {2 * hub_eccentricity}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Label connected components and report graph stats.")
+    parser.add_argument("directory", nargs="?", default="large")
+    args = parser.parse_args()
+
+    print("Loading data...")
+    graph = snapshot.load_graph(args.directory)
+    print("Data loaded.")
+
+    report(graph, load_components(args.directory, graph))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,75 +1,53 @@
-import csv
+import argparse
+import functools
 import sys
 
-from util import Node, StackFrontier, QueueFrontier
-
-# Maps names to a set of corresponding person_ids
-names = {}
-
-# Maps person_ids to a dictionary of: name, birth, movies (a set of movie_ids)
-people = {}
-
-# Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
-movies = {}
-
-
-def load_data(directory):
-    """
-    Load data from CSV files into memory.
-    """
-    # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
-
-    # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
-
-    # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+import graph as csr
+import landmarks
+import snapshot
+from loader import LoadReport
 
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
-
-    # Load data from files into memory
+    engines = {
+        "bfs": csr.shortest_path,
+        "bidirectional": csr.bidirectional_path,
+        "landmarks": landmarks.alt_path,
+    }
+
+    parser = argparse.ArgumentParser(
+        description="Find the degrees of separation between two people.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--engine", choices=sorted(engines), default="bfs",
+                        help="search engine used to find the path")
+    parser.add_argument("--no-snapshot", action="store_true",
+                        help="always parse the CSV files")
+    args = parser.parse_args()
+    directory = args.directory
+
+    # Load data from files (or their snapshot) into a compact graph
     print("Loading data...")
-    load_data(directory)
+    report = LoadReport()
+    graph = snapshot.load_graph(directory, not args.no_snapshot, report)
+    if report:
+        print(report)
     print("Data loaded.")
 
-    source = person_id_for_name(input("Name: "))
+    search = engines[args.engine]
+    if args.engine == "landmarks":
+        index = landmarks.load_index(directory)
+        if index is None:
+            sys.exit("No landmark index; run landmarks.py first.")
+        search = functools.partial(search, index=index)
+
+    source = person_index_for_name(graph, input("Name: "))
     if source is None:
         sys.exit("Person not found.")
-    target = person_id_for_name(input("Name: "))
+    target = person_index_for_name(graph, input("Name: "))
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = search(graph, source, target)
 
     if path is None:
         print("Not connected.")
@@ -78,99 +56,37 @@ def main():
         print(f"{degrees} degrees of separation.")
         path = [(None, source)] + path
         for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
+            person1 = graph.person_names[path[i][1]]
+            person2 = graph.person_names[path[i + 1][1]]
+            movie = graph.movie_titles[path[i + 1][0]]
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
-    """
-    Returns the shortest list of (movie_id, person_id) pairs
-    that connect the source to the target.
-
-    If no possible path, returns None.
-    """
-    num_explored = 0
-
-    start = Node(state=source, parent=None, action=None)
-    frontier = QueueFrontier()
-    frontier.add(start)
-
-    explored = set()
-
-    while True:
-
-        if source == target:
-            # return [tuple(list(neighbors_for_person(start.state))[0])]
-            return []
-
-        if frontier.empty():
-            return None
-
-        node = frontier.remove()
-        num_explored += 1
-
-        explored.add(node.state)
-
-        for movie_id, actor_id in neighbors_for_person(node.state):
-            if not frontier.contains_state(actor_id) and actor_id not in explored:
-                child = Node(state=actor_id, parent=node, action=movie_id)
-
-                if child.state == target:
-                    path = []
-                    node = child
-
-                    while node.parent is not None:
-                        path.append((node.action, node.state))
-                        node = node.parent
-
-                    path.reverse()
-
-                    return path
-
-                frontier.add(child)
-
-    # TODO
-
-
-def person_id_for_name(name):
+def person_index_for_name(graph, name):
     """
-    Returns the IMDB id for a person's name,
+    Returns the graph index for a person's name,
     resolving ambiguities as needed.
     """
-    person_ids = list(names.get(name.lower(), set()))
-    if len(person_ids) == 0:
+    indices = graph.indices_for_name(name)
+    if len(indices) == 0:
         return None
-    elif len(person_ids) > 1:
+    elif len(indices) > 1:
         print(f"Which '{name}'?")
-        for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
+        for index in indices:
+            person_id = graph.person_ids[index]
+            name = graph.person_names[index]
+            birth = graph.person_births[index]
             print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
         try:
             person_id = input("Intended Person ID: ")
-            if person_id in person_ids:
-                return person_id
+            index = graph.person_index.get(person_id)
+            if index in indices:
+                return index
         except ValueError:
             pass
         return None
     else:
-        return person_ids[0]
-
-
-def neighbors_for_person(person_id):
-    """
-    Returns (movie_id, person_id) pairs for people
-    who starred with a given person.
-    """
-    movie_ids = people[person_id]["movies"]
-    neighbors = set()
-    for movie_id in movie_ids:
-        for person_id in movies[movie_id]["stars"]:
-            neighbors.add((movie_id, person_id))
-    return neighbors
+        return indices[0]
 
 
 if __name__ == "__main__":
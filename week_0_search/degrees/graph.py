@@ -0,0 +1,455 @@
+"""
+Compact, integer-indexed representation of the degrees dataset.
+
+People and movies are interned to dense indices 0..n-1 and the star
+relation is stored twice in compressed sparse row (CSR) form: for each
+person the movies they starred in, and for each movie its stars. The
+adjacency lives in flat `array` buffers instead of per-entity sets, and
+searches work on plain ints, translating back to IMDb IDs only for output.
+"""
+
+from array import array
+from bisect import bisect_left
+from collections import deque
+from functools import cached_property
+
+from loader import LoadReport, read_rows
+
+
+class Graph():
+    """
+    Bipartite person/movie graph with CSR adjacency in both directions.
+
+    `person_offsets[p]:person_offsets[p + 1]` slices `person_movies` to the
+    movies of person `p`; `movie_offsets` and `movie_stars` do the same for
+    the stars of each movie.
+    """
+
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_stars,
+                 sorted_names, name_order):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_stars = movie_stars
+
+        # Lowercase names in sorted order, and the person index of each
+        self.sorted_names = sorted_names
+        self.name_order = name_order
+
+    @cached_property
+    def person_index(self):
+        """
+        Maps IMDb person ids to indices, built on first use.
+        """
+        return {person_id: i for i, person_id in enumerate(self.person_ids)}
+
+    @classmethod
+    def from_csv(cls, directory, report=None):
+        """
+        Builds a graph from the people, movies and stars CSV files.
+
+        The files are streamed in chunks and strings are packed into
+        StringTables as they are read. The id lookups needed to resolve
+        star rows are dropped once the edges are built, so no per-row
+        Python objects outlive loading (person_index is rebuilt on demand,
+        as for a snapshot). Unusable rows are counted in `report`.
+        """
+        if report is None:
+            report = LoadReport()
+
+        person_ids, person_names, person_births = (
+            StringTable(), StringTable(), StringTable())
+        person_index = {}
+        for chunk in read_rows(f"{directory}/people.csv",
+                               ("id", "name", "birth"), report):
+            for person_id, name, birth in chunk:
+                if person_id in person_index:
+                    report.drop("people.csv", "duplicate ids")
+                    continue
+                person_index[person_id] = len(person_index)
+                person_ids.append(person_id)
+                person_names.append(name)
+                person_births.append(birth)
+
+        movie_ids, movie_titles, movie_years = (
+            StringTable(), StringTable(), StringTable())
+        movie_index = {}
+        for chunk in read_rows(f"{directory}/movies.csv",
+                               ("id", "title", "year"), report):
+            for movie_id, title, year in chunk:
+                if movie_id in movie_index:
+                    report.drop("movies.csv", "duplicate ids")
+                    continue
+                movie_index[movie_id] = len(movie_index)
+                movie_ids.append(movie_id)
+                movie_titles.append(title)
+                movie_years.append(year)
+
+        star_people, star_movies = array("i"), array("i")
+        for chunk in read_rows(f"{directory}/stars.csv",
+                               ("person_id", "movie_id"), report):
+            for person_id, movie_id in chunk:
+                person = person_index.get(person_id)
+                movie = movie_index.get(movie_id)
+                if person is None:
+                    report.drop("stars.csv", "rows with unknown person ids")
+                elif movie is None:
+                    report.drop("stars.csv", "rows with unknown movie ids")
+                else:
+                    star_people.append(person)
+                    star_movies.append(movie)
+        del person_index, movie_index
+
+        person_offsets, person_movies = build_csr(
+            len(person_ids), star_people, star_movies)
+        movie_offsets, movie_stars = build_csr(
+            len(movie_ids), star_movies, star_people)
+        del star_people, star_movies
+
+        sorted_names, name_order = sort_names(person_names)
+
+        return cls(person_ids, person_names, person_births,
+                   movie_ids, movie_titles, movie_years,
+                   person_offsets, person_movies, movie_offsets, movie_stars,
+                   sorted_names, name_order)
+
+    @property
+    def num_people(self):
+        return len(self.person_offsets) - 1
+
+    @property
+    def num_movies(self):
+        return len(self.movie_offsets) - 1
+
+    def movies_for_person(self, person):
+        """
+        Returns the movie indices that person `person` starred in.
+        """
+        offsets = self.person_offsets
+        return self.person_movies[offsets[person]:offsets[person + 1]]
+
+    def stars_for_movie(self, movie):
+        """
+        Returns the person indices that starred in movie `movie`.
+        """
+        offsets = self.movie_offsets
+        return self.movie_stars[offsets[movie]:offsets[movie + 1]]
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for people
+        who starred with a given person.
+        """
+        for movie in self.movies_for_person(person):
+            for star in self.stars_for_movie(movie):
+                yield movie, star
+
+    def indices_for_name(self, name):
+        """
+        Returns the indices of every person named `name`, ignoring case.
+        """
+        name = name.lower()
+        i = bisect_left(self.sorted_names, name)
+        indices = []
+        while i < len(self.sorted_names) and self.sorted_names[i] == name:
+            indices.append(self.name_order[i])
+            i += 1
+        return indices
+
+    def to_ids(self, path):
+        """
+        Translates a path of (movie, person) indices to IMDb ids.
+        """
+        return [(self.movie_ids[movie], self.person_ids[person])
+                for movie, person in path]
+
+
+class StringTable():
+    """
+    Sequence of strings stored as one UTF-8 blob plus offsets.
+
+    Strings are only decoded when they are looked up. A table built in
+    memory can be appended to; one mapped from a snapshot is read-only.
+    """
+
+    def __init__(self, offsets=None, blob=None):
+        self.offsets = array("q", [0]) if offsets is None else offsets
+        self.blob = bytearray() if blob is None else blob
+
+    @classmethod
+    def pack(cls, strings):
+        """
+        Returns a table holding a sequence of strings.
+        """
+        if isinstance(strings, cls):
+            return strings
+        table = cls()
+        for string in strings:
+            table.append(string)
+        return table
+
+    def append(self, string):
+        self.blob += string.encode("utf-8")
+        self.offsets.append(len(self.blob))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+
+def sort_names(names):
+    """
+    Returns (StringTable of the sorted lowercase names,
+             person index of each sorted name).
+    """
+    lowered = [name.lower() for name in names]
+    order = sorted(range(len(lowered)), key=lowered.__getitem__)
+    return StringTable.pack(lowered[i] for i in order), array("i", order)
+
+
+def build_csr(count, sources, targets):
+    """
+    Groups `targets` by `sources` with a counting sort.
+
+    Returns (offsets, values) so that the targets of source `s` are
+    `values[offsets[s]:offsets[s + 1]]`.
+    """
+    offsets = array("i", bytes(4 * (count + 1)))
+    for source in sources:
+        offsets[source + 1] += 1
+    for i in range(count):
+        offsets[i + 1] += offsets[i]
+
+    cursor = array("i", offsets)
+    values = array("i", bytes(4 * len(targets)))
+    for source, target in zip(sources, targets):
+        values[cursor[source]] = target
+        cursor[source] += 1
+    return offsets, values
+
+
+def shortest_path(graph, source, target):
+    """
+    Returns the shortest list of (movie, person) index pairs
+    that connect the source to the target.
+
+    If no possible path, returns None.
+    """
+    return shortest_paths(graph, source, [target])[target]
+
+
+def shortest_paths(graph, source, targets):
+    """
+    Returns a dict mapping each of `targets` to its shortest path from
+    `source`, as shortest_path would, growing a single breadth-first
+    tree until every target has been reached.
+    """
+    return BreadthFirstTree(graph, source).paths(targets)
+
+
+class BreadthFirstTree():
+    """
+    A breadth-first search tree from `source` that grows on demand.
+
+    paths() only expands the tree until the requested targets are
+    reached, and a later call resumes from where the last one stopped,
+    so one tree can answer queries for the same source over time.
+    """
+
+    def __init__(self, graph, source):
+        self.graph = graph
+        self.source = source
+
+        # Each movie only needs to be expanded once: the first time it is
+        # reached, all of its stars join the frontier at the same depth
+        self.parent_person = array("i", [-1]) * graph.num_people
+        self.parent_movie = array("i", [-1]) * graph.num_people
+        self.movie_seen = bytearray(graph.num_movies)
+        self.parent_person[source] = source
+        self.frontier = deque([source])
+
+    def paths(self, targets):
+        """
+        Returns a dict mapping each of `targets` to its shortest path
+        from the source, or None if it is not connected to it.
+        """
+        source = self.source
+        parent_person, parent_movie = self.parent_person, self.parent_movie
+        movie_seen, frontier = self.movie_seen, self.frontier
+        person_offsets = self.graph.person_offsets
+        person_movies = self.graph.person_movies
+        movie_offsets = self.graph.movie_offsets
+        movie_stars = self.graph.movie_stars
+
+        remaining = {target for target in targets
+                     if parent_person[target] == -1}
+        while remaining and frontier:
+            person = frontier.popleft()
+            for i in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[i]
+                if movie_seen[movie]:
+                    continue
+                movie_seen[movie] = 1
+                for j in range(movie_offsets[movie],
+                               movie_offsets[movie + 1]):
+                    star = movie_stars[j]
+                    if parent_person[star] != -1:
+                        continue
+                    parent_person[star] = person
+                    parent_movie[star] = movie
+                    remaining.discard(star)
+                    frontier.append(star)
+
+        return {
+            target: None if parent_person[target] == -1
+            else trace_path(target, source, parent_person, parent_movie)
+            for target in targets
+        }
+
+
+def distances_from(graph, source):
+    """
+    Returns an array of the number of degrees between `source` and every
+    person, with -1 for people who are not connected to `source`.
+    """
+    distances = array("i", [-1]) * graph.num_people
+    movie_seen = bytearray(graph.num_movies)
+    distances[source] = 0
+
+    person_offsets, person_movies = graph.person_offsets, graph.person_movies
+    movie_offsets, movie_stars = graph.movie_offsets, graph.movie_stars
+
+    frontier = deque([source])
+    while frontier:
+        person = frontier.popleft()
+        distance = distances[person] + 1
+        for i in range(person_offsets[person], person_offsets[person + 1]):
+            movie = person_movies[i]
+            if movie_seen[movie]:
+                continue
+            movie_seen[movie] = 1
+            for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                star = movie_stars[j]
+                if distances[star] == -1:
+                    distances[star] = distance
+                    frontier.append(star)
+    return distances
+
+
+def trace_path(person, root, parent_person, parent_movie):
+    """
+    Follows parent links from `person` back to `root`.
+
+    Returns the (movie, person) steps in root-to-person order.
+    """
+    path = []
+    while person != root:
+        path.append((parent_movie[person], person))
+        person = parent_person[person]
+    path.reverse()
+    return path
+
+
+def bidirectional_path(graph, source, target):
+    """
+    Returns the shortest list of (movie, person) index pairs
+    that connect the source to the target, searching from both ends.
+
+    Breadth-first layers are grown alternately from the source and the
+    target, always expanding the side with the smaller frontier, until
+    the two searches meet. Returns the same result as shortest_path.
+    """
+    if source == target:
+        return []
+
+    forward = {source: None}
+    backward = {target: None}
+    forward_movies, backward_movies = set(), set()
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meeting = expand_layer(
+                graph, forward_frontier, forward, forward_movies, backward)
+        else:
+            backward_frontier, meeting = expand_layer(
+                graph, backward_frontier, backward, backward_movies, forward)
+
+        if meeting is not None:
+            return splice_path(meeting, forward, backward)
+
+    return None
+
+
+def expand_layer(graph, frontier, parents, seen_movies, other_parents):
+    """
+    Expands one breadth-first layer of a bidirectional search.
+
+    Returns the next layer and the best meeting person, or None.
+    """
+    next_frontier = []
+    meeting = None
+    best_length = None
+    for person in frontier:
+        for movie in graph.movies_for_person(person):
+            if movie in seen_movies:
+                continue
+            seen_movies.add(movie)
+            for star in graph.stars_for_movie(movie):
+                if star not in parents:
+                    parents[star] = (movie, person)
+                    next_frontier.append(star)
+                if star in other_parents:
+                    length = (path_length(star, parents)
+                              + path_length(star, other_parents))
+                    if best_length is None or length < best_length:
+                        meeting, best_length = star, length
+    return next_frontier, meeting
+
+
+def path_length(person, parents):
+    """
+    Returns the number of steps from person back to its search root.
+    """
+    length = 0
+    while parents[person] is not None:
+        person = parents[person][1]
+        length += 1
+    return length
+
+
+def splice_path(meeting, forward, backward):
+    """
+    Joins the forward and backward halves of a path at `meeting`.
+    """
+    path = []
+    person = meeting
+    while forward[person] is not None:
+        movie, parent = forward[person]
+        path.append((movie, person))
+        person = parent
+    path.reverse()
+
+    person = meeting
+    while backward[person] is not None:
+        movie, child = backward[person]
+        path.append((movie, child))
+        person = child
+    return path
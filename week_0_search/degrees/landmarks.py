@@ -0,0 +1,205 @@
+"""
+Precomputed landmark distance index for degrees.
+
+Usage: python landmarks.py [directory] [--landmarks K]
+
+The builder picks the K people with the most co-star links as landmarks,
+runs a full breadth-first search from each, and stores the distance
+arrays, together with connected-component ids, next to the CSV files.
+
+alt_path then answers queries with A* search using the ALT lower bound:
+by the triangle inequality, the distance from a person p to the target t
+is at least |d(L, t) - d(L, p)| for every landmark L. People in different
+components are reported as not connected without searching at all.
+"""
+
+import argparse
+import heapq
+import os
+from array import array
+
+import components
+import graph as csr
+import snapshot
+
+INDEX_NAME = "landmarks.index"
+INDEX_VERSION = 1
+
+# Distance stored for people a landmark cannot reach
+UNREACHABLE = 0xFFFF
+
+
+class LandmarkIndex():
+    """
+    Landmark distances and component ids for every person in a graph.
+    """
+
+    def __init__(self, landmarks, distances, components):
+        self.landmarks = landmarks
+        self.distances = distances
+        self.components = components
+
+    def connected(self, person, other):
+        """
+        Returns True if there is any path between the two people.
+        """
+        return self.components[person] == self.components[other]
+
+    def heuristic(self, target):
+        """
+        Returns a function giving a lower bound on the degrees from any
+        person to `target`.
+        """
+        tables = [(distances, distances[target])
+                  for distances in self.distances
+                  if distances[target] != UNREACHABLE]
+
+        def lower_bound(person):
+            best = 0
+            for distances, target_distance in tables:
+                bound = abs(target_distance - distances[person])
+                if bound > best:
+                    best = bound
+            return best
+
+        return lower_bound
+
+
+def pick_landmarks(graph, count):
+    """
+    Returns the `count` people with the most co-star links.
+
+    A person's links are counted per movie, so a co-star shared by two
+    movies counts twice; that keeps the pass linear in the graph size.
+    """
+    def links(person):
+        return sum(len(graph.stars_for_movie(movie)) - 1
+                   for movie in graph.movies_for_person(person))
+
+    return heapq.nlargest(count, range(graph.num_people), key=links)
+
+
+def build_index(graph, count):
+    """
+    Returns a LandmarkIndex with `count` landmarks for `graph`.
+    """
+    landmarks = pick_landmarks(graph, count)
+    distances = []
+    for landmark in landmarks:
+        table = array("H", (UNREACHABLE if distance == -1
+                            else min(distance, UNREACHABLE - 1)
+                            for distance in csr.distances_from(graph,
+                                                               landmark)))
+        distances.append(table)
+    return LandmarkIndex(landmarks, distances,
+                         components.label_components(graph).labels)
+
+
+def save_index(index, path, key):
+    """
+    Writes `index` to `path`, tagged with the snapshot key of its data.
+    """
+    sections = {"components": array("i", index.components)}
+    for i, distances in enumerate(index.distances):
+        sections[f"distances.{i}"] = distances
+    header = {
+        "key": dict(key, index_version=INDEX_VERSION),
+        "landmarks": list(index.landmarks),
+    }
+    snapshot.write_sections(path, header, sections)
+
+
+def load_index(directory):
+    """
+    Memory-maps the landmark index for `directory`.
+
+    Returns None if it has not been built, or if the CSV files have
+    changed since it was.
+    """
+    header, sections = snapshot.read_sections(
+        os.path.join(directory, INDEX_NAME))
+    key = dict(snapshot.snapshot_key(directory), index_version=INDEX_VERSION)
+    if header is None or header.get("key") != key:
+        return None
+    landmarks = header["landmarks"]
+    distances = [sections[f"distances.{i}"] for i in range(len(landmarks))]
+    return LandmarkIndex(landmarks, distances, sections["components"])
+
+
+def alt_path(graph, source, target, index):
+    """
+    Returns the shortest list of (movie, person) index pairs
+    that connect the source to the target, using A* search guided
+    by the landmark lower bounds in `index`.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+    if not index.connected(source, target):
+        return None
+
+    lower_bound = index.heuristic(target)
+
+    # Cost of the best path found to each person, and how it got there
+    costs = {source: 0}
+    parents = {}
+    closed = set()
+
+    # The lowest cost each movie has been expanded at; expanding it again
+    # from a person reached at the same cost or later cannot help
+    movie_costs = {}
+
+    # Ties on the estimate go to the deeper person, which is closer to done
+    heap = [(lower_bound(source), 0, source)]
+    while heap:
+        _, _, person = heapq.heappop(heap)
+        if person in closed:
+            continue
+        if person == target:
+            path = []
+            while person != source:
+                movie, parent = parents[person]
+                path.append((movie, person))
+                person = parent
+            path.reverse()
+            return path
+        closed.add(person)
+
+        cost = costs[person] + 1
+        for movie in graph.movies_for_person(person):
+            if movie_costs.get(movie, cost) < cost:
+                continue
+            movie_costs[movie] = cost - 1
+            for star in graph.stars_for_movie(movie):
+                if star in closed or costs.get(star, cost + 1) <= cost:
+                    continue
+                costs[star] = cost
+                parents[star] = (movie, person)
+                heapq.heappush(heap, (cost + lower_bound(star), -cost, star))
+
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build the landmark distance index for degrees.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--landmarks", type=int, default=16,
+                        help="number of landmarks to pick")
+    args = parser.parse_args()
+
+    print("Loading data...")
+    graph = snapshot.load_graph(args.directory)
+    print("Data loaded.")
+
+    index = build_index(graph, args.landmarks)
+    key = snapshot.snapshot_key(args.directory)
+    save_index(index, os.path.join(args.directory, INDEX_NAME), key)
+    components = len(set(index.components))
+    print(f"Indexed {len(index.landmarks)} landmarks over "
+          f"{graph.num_people} people in {components} components.")
+
+
+if __name__ == "__main__":
+    main()
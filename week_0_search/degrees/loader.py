@@ -0,0 +1,69 @@
+"""
+Streaming CSV reading for the degrees dataset.
+
+Rows are read lazily in fixed-size chunks and reduced to just the columns
+a caller asks for, so loading never holds more than one chunk of parsed
+CSV rows at a time. Rows that cannot be used are not silently dropped:
+they are counted, by file and reason, in a LoadReport.
+"""
+
+import csv
+import os
+from collections import Counter
+
+# Rows parsed per chunk
+CHUNK_SIZE = 16384
+
+
+class LoadReport():
+    """
+    Counts rows that were dropped while loading, by file and reason.
+    """
+
+    def __init__(self):
+        self.dropped = Counter()
+
+    def drop(self, filename, reason, count=1):
+        self.dropped[(filename, reason)] += count
+
+    def __bool__(self):
+        return bool(self.dropped)
+
+    def __str__(self):
+        lines = [f"Dropped {sum(self.dropped.values())} rows:"]
+        for (filename, reason), count in sorted(self.dropped.items()):
+            lines.append(f"    {filename}: {count} {reason}")
+        return "\n".join(lines)
+
+
+def read_rows(path, columns, report, chunk_size=CHUNK_SIZE):
+    """
+    Yields lists of at most `chunk_size` rows from the CSV file at `path`,
+    each row a tuple of the values in `columns`.
+
+    Rows with the wrong number of fields are counted in `report` and
+    skipped. Raises ValueError if the header lacks one of `columns`.
+    """
+    filename = os.path.basename(path)
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        missing = [column for column in columns if column not in header]
+        if missing:
+            raise ValueError(f"{filename} has no {missing[0]!r} column")
+        positions = [header.index(column) for column in columns]
+        width = len(header)
+
+        chunk = []
+        for row in reader:
+            if len(row) != width:
+                report.drop(filename, "malformed rows")
+                continue
+            chunk.append(tuple([row[i] for i in positions]))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
@@ -0,0 +1,181 @@
+"""
+Non-interactive, ranked name lookup for degrees.
+
+person_id_for_name only finds exact (lowercase) matches and asks on the
+terminal when a name is ambiguous, which a batch service cannot do. A
+NameIndex instead ranks candidates without prompting:
+
+    exact matches, then names starting with the query, then names sharing
+    the most character trigrams with it (to survive typos),
+
+and breaks ties between equally good matches (namesakes, typically) by
+birth year when one is given.
+Exact and prefix matches come straight from the graph's sorted name table;
+the trigram postings are built once and saved next to the CSV files.
+"""
+
+import heapq
+import os
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+import snapshot
+from graph import StringTable, build_csr
+
+NAMES_NAME = "names.index"
+NAMES_VERSION = 1
+
+# Number of rarest query trigrams used to gather candidates, and how many
+# candidates are scored in full
+SEED_TRIGRAMS = 4
+MAX_CANDIDATES = 64
+
+# Scores for exact matches and the base score for prefix matches
+EXACT, PREFIX = 3.0, 2.0
+
+
+def normalize(name):
+    """
+    Returns `name` lowercased with runs of whitespace collapsed.
+    """
+    return " ".join(name.lower().split())
+
+
+def trigrams(name):
+    """
+    Returns the set of character trigrams of a normalized name, padded
+    so that the start of the name weighs the most.
+    """
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex():
+    """
+    Ranked name lookup over the people of a graph.
+    """
+
+    def __init__(self, graph, grams, offsets, postings):
+        self.graph = graph
+        self.grams = grams
+        self.offsets = offsets
+        self.postings = postings
+
+    @classmethod
+    def build(cls, graph):
+        """
+        Builds the trigram postings for every person in `graph`.
+        """
+        gram_ids = {}
+        gram_people, gram_keys = array("i"), array("i")
+        for person in range(graph.num_people):
+            for gram in trigrams(normalize(graph.person_names[person])):
+                gram_people.append(person)
+                gram_keys.append(gram_ids.setdefault(gram, len(gram_ids)))
+
+        # Number trigrams in sorted order so they can be found by bisection
+        order = sorted(gram_ids, key=gram_ids.__getitem__)
+        ranks = array("i", [0]) * len(order)
+        for rank, gram in enumerate(sorted(order)):
+            ranks[gram_ids[gram]] = rank
+        gram_keys = array("i", (ranks[key] for key in gram_keys))
+
+        offsets, postings = build_csr(len(order), gram_keys, gram_people)
+        return cls(graph, StringTable.pack(sorted(order)), offsets, postings)
+
+    def people_with(self, gram):
+        """
+        Returns the people whose names contain trigram `gram`.
+        """
+        i = bisect_left(self.grams, gram)
+        if i == len(self.grams) or self.grams[i] != gram:
+            return self.postings[0:0]
+        return self.postings[self.offsets[i]:self.offsets[i + 1]]
+
+    def lookup(self, name, birth=None, limit=10):
+        """
+        Returns up to `limit` (person index, score) pairs for people whose
+        names best match `name`, best first.
+
+        When `birth` is given, people born that year rank above equally
+        good matches born in other years.
+        """
+        query = normalize(name)
+        if not query:
+            return []
+        scores = {}
+
+        sorted_names = self.graph.sorted_names
+        name_order = self.graph.name_order
+        i = bisect_left(sorted_names, query)
+        while i < len(sorted_names) and len(scores) < MAX_CANDIDATES:
+            candidate = sorted_names[i]
+            if not candidate.startswith(query):
+                break
+            if candidate == query:
+                scores[name_order[i]] = EXACT
+            else:
+                scores[name_order[i]] = PREFIX + len(query) / len(candidate)
+            i += 1
+
+        if len(scores) < limit:
+            self.add_similar(query, scores)
+
+        births = self.graph.person_births
+        birth = None if birth is None else str(birth)
+
+        def rank(item):
+            person, score = item
+            return (-score, births[person] != birth, person)
+
+        best = heapq.nsmallest(limit, scores.items(), key=rank)
+        return [(person, round(score, 3)) for person, score in best]
+
+    def add_similar(self, query, scores):
+        """
+        Scores people sharing trigrams with `query` by their Jaccard
+        similarity, for those not already in `scores`.
+        """
+        query_grams = trigrams(query)
+        # Trigrams no name contains (typically the ones a typo creates)
+        # gather nobody, so they must not take the seed slots
+        postings = sorted((people for people in map(self.people_with,
+                                                    query_grams) if people),
+                          key=len)
+        hits = Counter()
+        for people in postings[:SEED_TRIGRAMS]:
+            hits.update(people)
+
+        for person, _ in hits.most_common(MAX_CANDIDATES):
+            if person in scores:
+                continue
+            grams = trigrams(normalize(self.graph.person_names[person]))
+            shared = len(grams & query_grams)
+            scores[person] = shared / len(grams | query_grams)
+
+
+def load_name_index(directory, graph):
+    """
+    Returns the NameIndex for `directory`, memory-mapped from disk when
+    it is up to date, or built from `graph` and saved otherwise.
+    """
+    path = os.path.join(directory, NAMES_NAME)
+    key = dict(snapshot.snapshot_key(directory), names_version=NAMES_VERSION)
+    header, sections = snapshot.read_sections(path)
+    if header is not None and header.get("key") == key:
+        grams = StringTable(sections["grams.offsets"], sections["grams.blob"])
+        return NameIndex(graph, grams, sections["offsets"],
+                         sections["postings"])
+
+    index = NameIndex.build(graph)
+    try:
+        snapshot.write_sections(path, {"key": key}, {
+            "grams.offsets": index.grams.offsets,
+            "grams.blob": index.grams.blob,
+            "offsets": index.offsets,
+            "postings": index.postings,
+        })
+    except OSError:
+        pass
+    return index
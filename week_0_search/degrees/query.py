@@ -0,0 +1,257 @@
+"""
+Batch degrees-of-separation query mode.
+
+Usage: python query.py [directory] [--input FILE] [--workers N]
+
+Loads the graph once and answers queries read as JSON lines, one object
+per line with "source" and "target" IMDb person ids (plus an optional
+"id" that is echoed back), from a file or stdin:
+
+    {"id": 1, "source": "102", "target": "158"}
+
+Each answer is written to stdout as one JSON line, in input order:
+
+    {"id": 1, "source": "102", "target": "158", "degrees": 1,
+     "path": [{"movie_id": "112384", "person_id": "158"}]}
+
+"degrees" and "path" are null when the two people are not connected.
+
+Instead of an id, either person may be given by name, optionally with a
+birth year to pick between namesakes, for example
+{"source_name": "Kevin Bacon", "target_name": "Tom Cruise",
+"target_birth": 1962}. Names are resolved without prompting through the
+ranked NameIndex, and only when exactly one person has that name (or that
+name and birth year). The answer carries the resolved ids, or an error
+with the candidate ids, best first, when the name is ambiguous or only
+matches approximately (a prefix or a likely typo).
+
+Queries are read in batches; within a batch, queries sharing a source are
+answered from a single breadth-first tree, and the groups are fanned out
+across worker processes several at a time. Each worker keeps the trees of
+its most recent sources, grown only as far as their queries needed, so a
+source that comes back in a later batch resumes its tree instead of
+starting over. Every worker memory-maps the same graph snapshot, so the
+graph is shared read-only rather than copied, and works only in person
+and movie indices: ids are translated to indices and back in the main
+process.
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import components as cc
+import graph as csr
+import snapshot
+from name_index import EXACT, load_name_index
+
+# Number of recent breadth-first trees each process keeps (each takes
+# two ints per person and a byte per movie), and how many tasks each
+# worker gets per batch
+TREE_CACHE_SIZE = 8
+TASKS_PER_WORKER = 4
+
+# Graph and its components used by this process, set by init_worker
+graph = None
+components = None
+
+# Breadth-first trees of recent sources, least recently used first
+trees = OrderedDict()
+
+# Name lookup, only needed (and loaded) by the main process
+names = None
+
+
+class QueryError(Exception):
+    """
+    A query that cannot be answered, with any candidate person ids.
+    """
+
+    def __init__(self, message, candidates=None):
+        super().__init__(message)
+        self.candidates = candidates
+
+
+def init_worker(directory):
+    """
+    Loads the graph snapshot and its components in a worker process.
+    """
+    global graph, components
+    graph = snapshot.load_graph(directory)
+    components = cc.load_components(directory, graph)
+    trees.clear()
+
+
+def tree_for(source):
+    """
+    Returns the breadth-first tree of `source` (a person index) from the
+    cache, or a new one, evicting the least recently used.
+    """
+    if source in trees:
+        trees.move_to_end(source)
+    else:
+        trees[source] = csr.BreadthFirstTree(graph, source)
+        if len(trees) > TREE_CACHE_SIZE:
+            trees.popitem(last=False)
+    return trees[source]
+
+
+def answer_group(source, targets):
+    """
+    Returns the paths from `source` to each of `targets` (person indices),
+    as lists of (movie, person) indices (or None), in the order of
+    `targets`.
+    """
+    # Only search for targets in the source's component
+    paths = tree_for(source).paths([
+        target for target in targets if components.connected(source, target)
+    ])
+    return [paths.get(target) for target in targets]
+
+
+def resolve_person(query, role):
+    """
+    Returns the person index of the `role` ("source" or "target") person
+    of a query, given either as an IMDb id or as a name and optional
+    birth year.
+
+    Raises QueryError if there is no such person, if the name matches
+    several people equally well, or if no name matches exactly (with the
+    closest people as candidates).
+    """
+    if role in query:
+        person_id = str(query[role])
+        if person_id not in graph.person_index:
+            raise QueryError(f"unknown person id: {person_id}")
+        return graph.person_index[person_id]
+
+    name = query.get(f"{role}_name")
+    if not isinstance(name, str):
+        raise QueryError("query needs a source and a target")
+    birth = query.get(f"{role}_birth")
+    matches = names.lookup(name, birth)
+    if not matches:
+        raise QueryError(f"no person matches name: {name}")
+    if matches[0][1] < EXACT:
+        raise QueryError(f"no exact match for name: {name}",
+                         [graph.person_ids[person] for person, _ in matches])
+
+    def rank(match):
+        person, score = match
+        return score, str(graph.person_births[person]) == str(birth)
+
+    tied = [person for person, score in matches
+            if rank((person, score)) == rank(matches[0])]
+    if len(tied) > 1:
+        raise QueryError(f"ambiguous name: {name}",
+                         [graph.person_ids[person] for person in tied])
+    return tied[0]
+
+
+def answer_batch(queries, executor=None, workers=1):
+    """
+    Returns one answer dict per query dict, in order, spreading the work
+    over `workers` processes of `executor` if one is given.
+    """
+    answers = [None] * len(queries)
+    groups = {}
+    for i, query in enumerate(queries):
+        answer = {"id": query["id"]} if "id" in query else {}
+        answers[i] = answer
+        try:
+            source = resolve_person(query, "source")
+            target = resolve_person(query, "target")
+        except QueryError as e:
+            answer["error"] = str(e)
+            if e.candidates:
+                answer["candidates"] = e.candidates
+            continue
+        answer.update(source=graph.person_ids[source],
+                      target=graph.person_ids[target])
+        groups.setdefault(source, []).append((i, target))
+
+    sources = list(groups)
+    target_lists = [[target for _, target in groups[source]]
+                    for source in sources]
+    if executor is None:
+        results = map(answer_group, sources, target_lists)
+    else:
+        tasks = workers * TASKS_PER_WORKER
+        results = executor.map(answer_group, sources, target_lists,
+                               chunksize=max(1, -(-len(sources) // tasks)))
+
+    for source, paths in zip(sources, results):
+        for (i, _), path in zip(groups[source], paths):
+            if path is None:
+                answers[i].update(degrees=None, path=None)
+            else:
+                answers[i].update(degrees=len(path), path=[
+                    {"movie_id": movie_id, "person_id": person_id}
+                    for movie_id, person_id in graph.to_ids(path)
+                ])
+    return answers
+
+
+def read_batches(lines, size):
+    """
+    Yields lists of at most `size` parsed queries from JSON lines.
+
+    Blank lines are skipped; lines that are not JSON objects become
+    queries that answer_batch reports as errors.
+    """
+    lines = (line for line in lines if line.strip())
+    while True:
+        batch = []
+        for line in islice(lines, size):
+            try:
+                query = json.loads(line)
+            except json.JSONDecodeError:
+                query = None
+            batch.append(query if isinstance(query, dict) else {})
+        if not batch:
+            return
+        yield batch
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Answer batches of degrees queries from JSON lines.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--input", default="-",
+                        help="file of JSON line queries (default: stdin)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="worker processes (1 answers in-process)")
+    parser.add_argument("--batch-size", type=int, default=10000,
+                        help="queries read and grouped at a time")
+    args = parser.parse_args()
+
+    # Build the snapshot once up front so workers only ever map it
+    global names
+    init_worker(args.directory)
+    names = load_name_index(args.directory, graph)
+
+    executor = None
+    if args.workers > 1:
+        executor = ProcessPoolExecutor(args.workers, initializer=init_worker,
+                                       initargs=(args.directory,))
+
+    stream = sys.stdin if args.input == "-" else open(args.input,
+                                                      encoding="utf-8")
+    try:
+        for batch in read_batches(stream, args.batch_size):
+            for answer in answer_batch(batch, executor, args.workers):
+                print(json.dumps(answer))
+            sys.stdout.flush()
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        if executor is not None:
+            executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Versioned binary snapshots of the degrees graph.
+
+Parsing the CSV files is by far the slowest part of starting degrees.py
+on the large dataset. The first load writes every array and string table
+of the graph into a single file next to the CSVs; later loads memory-map
+that file and hand out views into it, so nothing is parsed or copied up
+front. A snapshot is only reused while the sizes and modification times
+of the CSV files match the ones it was built from.
+
+File layout: an 8 byte magic, a little header (its length as a 4 byte
+integer, then JSON describing the key and every section), and then the
+sections themselves, each aligned to 8 bytes. Other indexes built over
+the graph reuse the same layout through write_sections/read_sections.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from graph import Graph, StringTable
+
+MAGIC = b"DEGSNAP\0"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_NAME = "degrees.snapshot"
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+ARRAYS = ("person_offsets", "person_movies", "movie_offsets", "movie_stars",
+          "name_order")
+STRINGS = ("person_ids", "person_names", "person_births",
+           "movie_ids", "movie_titles", "movie_years", "sorted_names")
+
+
+def snapshot_key(directory):
+    """
+    Returns what a snapshot of `directory` must match to be reused.
+    """
+    key = {"version": SNAPSHOT_VERSION, "byteorder": sys.byteorder}
+    for name in SOURCES:
+        stat = os.stat(os.path.join(directory, name))
+        key[name] = [stat.st_size, stat.st_mtime_ns]
+    return key
+
+
+def load_graph(directory, use_snapshot=True, report=None):
+    """
+    Returns the graph for `directory`, from its snapshot when it is fresh.
+
+    Otherwise the graph is built from the CSV files, counting dropped rows
+    in `report` if given, and, if possible, saved as a snapshot for next
+    time.
+    """
+    if not use_snapshot:
+        return Graph.from_csv(directory, report)
+
+    key = snapshot_key(directory)
+    path = os.path.join(directory, SNAPSHOT_NAME)
+    graph = read_snapshot(path, key)
+    if graph is None:
+        graph = Graph.from_csv(directory, report)
+        try:
+            write_snapshot(graph, path, key)
+        except OSError:
+            pass
+    return graph
+
+
+def write_snapshot(graph, path, key):
+    """
+    Writes `graph` to a snapshot file at `path`.
+    """
+    sections = {}
+    for name in ARRAYS:
+        sections[name] = array("i", getattr(graph, name))
+    for name in STRINGS:
+        table = StringTable.pack(getattr(graph, name))
+        sections[f"{name}.offsets"] = table.offsets
+        sections[f"{name}.blob"] = table.blob
+    write_sections(path, {"key": key}, sections)
+
+
+def read_snapshot(path, key):
+    """
+    Memory-maps the snapshot at `path` and returns its graph.
+
+    Returns None if there is no snapshot, or if it was written by another
+    version or from different CSV files.
+    """
+    header, sections = read_sections(path)
+    if header is None or header.get("key") != key:
+        return None
+
+    values = {name: sections[name] for name in ARRAYS}
+    for name in STRINGS:
+        values[name] = StringTable(sections[f"{name}.offsets"],
+                                   sections[f"{name}.blob"])
+    return Graph(**values)
+
+
+def write_sections(path, header, sections):
+    """
+    Writes named arrays (or bytes) and a JSON-able header to `path`.
+
+    The file is written under a temporary name and then moved into place,
+    so readers never see a partial file.
+    """
+    layout = {}
+    position = 0
+    for name, data in sections.items():
+        typecode = data.typecode if isinstance(data, array) else "B"
+        size = len(data) * (data.itemsize if isinstance(data, array) else 1)
+        layout[name] = [position, size, typecode]
+        position = align(position + size)
+
+    header = json.dumps(dict(header, sections=layout)).encode("utf-8")
+    start = align(len(MAGIC) + 4 + len(header))
+
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<I", len(header)))
+            f.write(header)
+            for name, data in sections.items():
+                f.seek(start + layout[name][0])
+                f.write(data)
+            f.truncate(start + position)
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def read_sections(path):
+    """
+    Memory-maps a file written by write_sections.
+
+    Returns (header, sections), with each section a read-only view into
+    the mapping, or (None, None) if the file is missing or unreadable.
+    """
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None, None
+            header_size, = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(header_size))
+            buffer = memoryview(mmap.mmap(f.fileno(), 0,
+                                          access=mmap.ACCESS_READ))
+    except (OSError, ValueError, struct.error):
+        return None, None
+
+    start = align(len(MAGIC) + 4 + header_size)
+    sections = {}
+    try:
+        for name, (offset, size, typecode) in header["sections"].items():
+            view = buffer[start + offset:start + offset + size]
+            sections[name] = view if typecode == "B" else view.cast(typecode)
+    except (KeyError, TypeError, ValueError):
+        return None, None
+    return header, sections
+
+
+def align(position):
+    """
+    Rounds `position` up to a multiple of 8.
+    """
+    return (position + 7) & ~7
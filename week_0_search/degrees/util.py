@@ -1,4 +1,9 @@
+from collections import deque
+
+
 class Node():
+    __slots__ = ("state", "parent", "action")
+
     def __init__(self, state, parent, action):
         self.state = state
         self.parent = parent
@@ -36,3 +41,47 @@ class QueueFrontier(StackFrontier):
             node = self.frontier[0]
             self.frontier = self.frontier[1:]
             return node
+
+
+class DequeStackFrontier():
+    """
+    Stack frontier with O(1) add, remove and contains_state.
+
+    Nodes live in a deque and their states are mirrored in a set, so
+    membership tests never scan the frontier. A state is expected to be
+    in the frontier at most once, which is how the searches use it.
+    """
+
+    def __init__(self):
+        self.frontier = deque()
+        self.states = set()
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.states.add(node.state)
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def __len__(self):
+        return len(self.frontier)
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        node = self.frontier.pop()
+        self.states.discard(node.state)
+        return node
+
+
+class DequeQueueFrontier(DequeStackFrontier):
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        node = self.frontier.popleft()
+        self.states.discard(node.state)
+        return node
@@ -0,0 +1,198 @@
+"""
+Headless benchmark for the Tic Tac Toe engines.
+
+Usage: python benchmark.py [--engine NAME] [--games N] [--openings K]
+                           [--seed S] [--json]
+
+Counts the full game tree perft-style with the public initial_state/
+actions/result/terminal functions, then plays N self-play games with the
+chosen engine, starting each from K random opening moves so that games
+differ. The default engine is tictactoe-nobook, the minimax search itself:
+with the opening book, tictactoe answers every move by lookup and searches
+no nodes at all. Reports nodes per second, positions cached and wall time
+per move, as text or (with --json) as one JSON object for comparing engine
+variants across runs.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+
+import book
+import mcts
+import mnk
+import tictactoe as ttt
+
+
+class TictactoeEngine():
+    """
+    tictactoe.minimax, with or without the opening book.
+    """
+
+    def __init__(self, use_book=True):
+        self.use_book = use_book
+
+    def reset(self):
+        ttt.transposition_table.clear()
+        book.enable(self.use_book)
+
+    def move(self, board):
+        move = ttt.minimax(board)
+        return move, ttt.stats["nodes"], len(ttt.transposition_table)
+
+
+class MnkEngine():
+    """
+    mnk.Game(3, 3, 3) searching under a time budget.
+    """
+
+    def __init__(self, time_limit=mnk.DEFAULT_TIME_LIMIT):
+        self.game = mnk.Game(3, 3, 3, time_limit=time_limit)
+
+    def reset(self):
+        pass
+
+    def move(self, board):
+        move = self.game.minimax(board)
+        return move, self.game.stats["nodes"], len(self.game.table)
+
+
+class MctsEngine():
+    """
+    mcts.MCTS on the tictactoe module, with a fixed playout budget.
+
+    Playouts are reported as nodes, and tree size as positions cached.
+    """
+
+    def __init__(self, playouts=2000):
+        self.player = mcts.MCTS(ttt, playouts=playouts, seed=0)
+
+    def reset(self):
+        pass
+
+    def move(self, board):
+        move = self.player.best_move(board)
+        return (move, self.player.stats["playouts"],
+                self.player.stats["nodes"])
+
+
+ENGINES = {
+    "tictactoe": lambda: TictactoeEngine(),
+    "tictactoe-nobook": lambda: TictactoeEngine(use_book=False),
+    "mnk": lambda: MnkEngine(),
+    "mcts": lambda: MctsEngine(),
+}
+
+
+def perft(board, depth=None):
+    """
+    Returns the number of positions in the game tree below `board`,
+    `board` included, down to `depth` plies (the whole tree if None).
+    """
+    if ttt.terminal(board) or depth == 0:
+        return 1
+    return 1 + sum(
+        perft(ttt.result(board, action), None if depth is None else depth - 1)
+        for action in ttt.actions(board)
+    )
+
+
+def self_play(engine, games, openings, rng):
+    """
+    Plays `games` games of `engine` against itself.
+
+    Returns the outcome tally and a (seconds, nodes, cached) sample for
+    each move the engine made.
+    """
+    outcomes = {ttt.X: 0, ttt.O: 0, None: 0}
+    samples = []
+    for _ in range(games):
+        engine.reset()
+        board = ttt.initial_state()
+        for _ in range(openings):
+            if ttt.terminal(board):
+                break
+            board = ttt.result(board, rng.choice(sorted(ttt.actions(board))))
+        while not ttt.terminal(board):
+            start = time.perf_counter()
+            move, nodes, cached = engine.move(board)
+            samples.append((time.perf_counter() - start, nodes, cached))
+            board = ttt.result(board, move)
+        outcomes[ttt.winner(board)] += 1
+    return outcomes, samples
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark Tic Tac Toe engines.")
+    parser.add_argument("--engine", choices=sorted(ENGINES),
+                        default="tictactoe-nobook")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--openings", type=int, default=2,
+                        help="random moves played before the engine "
+                             "takes over")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true",
+                        help="print the results as JSON")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    positions = perft(ttt.initial_state())
+    perft_seconds = time.perf_counter() - start
+
+    engine = ENGINES[args.engine]()
+    start = time.perf_counter()
+    outcomes, samples = self_play(engine, args.games, args.openings,
+                                  random.Random(args.seed))
+    play_seconds = time.perf_counter() - start
+
+    move_times = [seconds for seconds, _, _ in samples]
+    nodes = sum(nodes for _, nodes, _ in samples)
+    search_seconds = sum(move_times)
+    results = {
+        "engine": args.engine,
+        "perft": {
+            "positions": positions,
+            "seconds": perft_seconds,
+            "positions_per_second": positions / perft_seconds,
+        },
+        "self_play": {
+            "games": args.games,
+            "openings": args.openings,
+            "seed": args.seed,
+            "x_wins": outcomes[ttt.X],
+            "o_wins": outcomes[ttt.O],
+            "ties": outcomes[None],
+            "moves": len(samples),
+            "seconds": play_seconds,
+            "nodes": nodes,
+            "nodes_per_second": nodes / search_seconds if search_seconds
+            else 0.0,
+            "max_cached": max((cached for _, _, cached in samples), default=0),
+            "move_seconds_mean": statistics.fmean(move_times)
+            if move_times else 0.0,
+            "move_seconds_max": max(move_times, default=0.0),
+        },
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    perft_results, play = results["perft"], results["self_play"]
+    print(f"Perft: {perft_results['positions']} positions in "
+          f"{perft_results['seconds']:.3f}s "
+          f"({perft_results['positions_per_second']:,.0f} positions/s)")
+    print(f"Self-play ({args.engine}): {play['games']} games, "
+          f"X {play['x_wins']} / O {play['o_wins']} / tie {play['ties']}")
+    print(f"    {play['moves']} moves, {play['nodes']} nodes searched "
+          f"({play['nodes_per_second']:,.0f} nodes/s)")
+    print(f"    {play['max_cached']} positions cached at most")
+    print(f"    {play['move_seconds_mean'] * 1000:.3f}ms per move on average, "
+          f"{play['move_seconds_max'] * 1000:.3f}ms at most")
+
+
+if __name__ == "__main__":
+    main()
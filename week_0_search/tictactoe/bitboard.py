@@ -0,0 +1,190 @@
+"""
+Bitboard representation of Tic Tac Toe boards.
+
+A board is a pair of 9-bit integers (x, o): bit 3 * i + j of x is set when
+X has played at (i, j), and likewise for o. player, actions, winner and
+the rest are then a few bit operations or lookups in tables precomputed
+over all 512 masks, instead of walks over a list of lists.
+
+from_board and to_board convert to and from the list-of-lists boards used
+by tictactoe.py and runner.py.
+"""
+
+X = "X"
+O = "O"
+EMPTY = None
+
+FULL = 0b111111111
+
+# Masks of the 8 lines that win the game
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,  # rows
+    0b001001001, 0b010010010, 0b100100100,  # columns
+    0b100010001, 0b001010100,               # diagonals
+)
+
+# Whether each 9-bit mask contains a whole line
+HAS_LINE = bytes(
+    any(mask & line == line for line in WIN_MASKS) for mask in range(512)
+)
+
+# The (i, j) moves for each mask of empty cells
+MOVES = tuple(
+    tuple((cell // 3, cell % 3) for cell in range(9) if mask >> cell & 1)
+    for mask in range(512)
+)
+
+
+def symmetry_tables():
+    """
+    Returns, for each of the 8 rotations and reflections of the board, a
+    table mapping every 9-bit mask to its transformed mask.
+    """
+    tables = []
+    for transform in (lambda i, j: (i, j), lambda i, j: (j, 2 - i),
+                      lambda i, j: (2 - i, 2 - j), lambda i, j: (2 - j, i)):
+        for reflect in (False, True):
+            cells = [transform(i, 2 - j if reflect else j)
+                     for i in range(3) for j in range(3)]
+            table = []
+            for mask in range(512):
+                transformed = 0
+                for cell, (i, j) in enumerate(cells):
+                    if mask >> (3 * i + j) & 1:
+                        transformed |= 1 << cell
+                table.append(transformed)
+            tables.append(tuple(table))
+    return tuple(tables)
+
+
+SYMMETRIES = symmetry_tables()
+
+
+def initial_state():
+    """
+    Returns the empty bitboard.
+    """
+    return (0, 0)
+
+
+def from_board(board):
+    """
+    Returns the bitboard for a list-of-lists board.
+    """
+    x = o = 0
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == X:
+                x |= 1 << (3 * i + j)
+            elif cell == O:
+                o |= 1 << (3 * i + j)
+    return (x, o)
+
+
+def to_board(state):
+    """
+    Returns the list-of-lists board for a bitboard.
+    """
+    x, o = state
+    return [[X if x >> (3 * i + j) & 1 else O if o >> (3 * i + j) & 1
+             else EMPTY for j in range(3)] for i in range(3)]
+
+
+def player(state):
+    """
+    Returns player who has the next turn on a bitboard.
+    """
+    x, o = state
+    return X if x.bit_count() == o.bit_count() else O
+
+
+def actions(state):
+    """
+    Returns the (i, j) moves available on a bitboard, as a tuple.
+    """
+    x, o = state
+    return MOVES[FULL & ~(x | o)]
+
+
+def result(state, action):
+    """
+    Returns the bitboard that results from making move (i, j).
+    """
+    i, j = action
+    if not (0 <= i <= 2 and 0 <= j <= 2):
+        raise ValueError(f"({i}, {j}) is not a valid move")
+    x, o = state
+    bit = 1 << (3 * i + j)
+    if (x | o) & bit:
+        raise ValueError(f"({i}, {j}) is not a valid move")
+    if x.bit_count() == o.bit_count():
+        return (x | bit, o)
+    return (x, o | bit)
+
+
+def winner(state):
+    """
+    Returns the winner of the game on a bitboard, if there is one.
+    """
+    x, o = state
+    if HAS_LINE[x]:
+        return X
+    if HAS_LINE[o]:
+        return O
+    return None
+
+
+def terminal(state):
+    """
+    Returns True if the game on a bitboard is over, False otherwise.
+    """
+    x, o = state
+    return x | o == FULL or HAS_LINE[x] or HAS_LINE[o]
+
+
+def utility(state):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    x, o = state
+    if HAS_LINE[x]:
+        return 1
+    if HAS_LINE[o]:
+        return -1
+    return 0
+
+
+def canonical(state):
+    """
+    Returns an integer key shared by a bitboard and all of its rotations
+    and reflections.
+    """
+    x, o = state
+    return min(table[x] << 9 | table[o] for table in SYMMETRIES)
+
+
+def canonical_form(state):
+    """
+    Returns (canonical bitboard, index of the symmetry that maps the
+    bitboard onto it).
+    """
+    x, o = state
+    key, symmetry = min((table[x] << 9 | table[o], symmetry)
+                        for symmetry, table in enumerate(SYMMETRIES))
+    return (key >> 9, key & FULL), symmetry
+
+
+def transform_move(action, symmetry, inverse=False):
+    """
+    Returns where move (i, j) lands under a symmetry, or, with `inverse`,
+    where it came from.
+    """
+    i, j = action
+    cell = 1 << (3 * i + j)
+    table = SYMMETRIES[symmetry]
+    if inverse:
+        cell = table.index(cell)
+    else:
+        cell = table[cell]
+    cell = cell.bit_length() - 1
+    return (cell // 3, cell % 3)
@@ -0,0 +1,120 @@
+"""
+Precomputed opening book for Tic Tac Toe.
+
+Usage: python book.py
+
+Folding out the 8 rotations and reflections of the board leaves only a
+few hundred reachable positions, so every one of them can be solved ahead
+of time. The book stores the best move for each canonical position in a
+table indexed by the position's base-3 number (cell 3 * i + j counting
+1 for X and 2 for O), one byte per entry, so lookups take constant time.
+"""
+
+import os
+
+import bitboard
+
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         "book.bin")
+MAGIC = b"TTTBOOK1"
+POSITIONS = 3 ** 9
+
+# Stored for positions that have no move in the book
+NO_MOVE = 0xFF
+
+# Base-3 value of each 9-bit mask, with every set cell counting 1
+TERNARY = tuple(sum(3 ** cell for cell in range(9) if mask >> cell & 1)
+                for mask in range(512))
+
+# The loaded book: None until the first lookup, False if there is none
+table = None
+
+
+def position_index(state):
+    """
+    Returns the base-3 index of a bitboard.
+    """
+    x, o = state
+    return TERNARY[x] + 2 * TERNARY[o]
+
+
+def generate(solve):
+    """
+    Returns the book as bytes, using `solve(state)` to find the best move
+    of each reachable, canonical, unfinished position.
+    """
+    moves = bytearray([NO_MOVE]) * POSITIONS
+    seen = set()
+    frontier = [bitboard.initial_state()]
+    while frontier:
+        state, _ = bitboard.canonical_form(frontier.pop())
+        if state in seen or bitboard.terminal(state):
+            continue
+        seen.add(state)
+        i, j = solve(state)
+        moves[position_index(state)] = 3 * i + j
+        for action in bitboard.actions(state):
+            frontier.append(bitboard.result(state, action))
+    return bytes(moves)
+
+
+def save(moves, path=BOOK_PATH):
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(moves)
+
+
+def load(path=BOOK_PATH):
+    """
+    Returns the book stored at `path`, or None if it is missing or invalid.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if data[:len(MAGIC)] != MAGIC or len(data) != len(MAGIC) + POSITIONS:
+        return None
+    return data[len(MAGIC):]
+
+
+def enable(enabled=True):
+    """
+    Turns the book on, to be loaded again on the next lookup, or off, so
+    that lookups find nothing and every move is searched.
+    """
+    global table
+    table = None if enabled else False
+
+
+def lookup(state):
+    """
+    Returns the book move (i, j) for a bitboard, or None if there is no
+    book or the position is not in it.
+    """
+    global table
+    if table is None:
+        table = load() or False
+    if not table:
+        return None
+
+    canonical, symmetry = bitboard.canonical_form(state)
+    cell = table[position_index(canonical)]
+    if cell == NO_MOVE:
+        return None
+    return bitboard.transform_move((cell // 3, cell % 3), symmetry,
+                                   inverse=True)
+
+
+def main():
+    # Imported here, as tictactoe itself consults the book
+    import tictactoe
+
+    moves = generate(tictactoe.search)
+    save(moves)
+    solved = sum(move != NO_MOVE for move in moves)
+    print(f"Solved {solved} positions into {BOOK_PATH}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Monte Carlo Tree Search Player
+
+An alternative to exhaustive minimax for tictactoe-style games. The game
+is anything with player/actions/result/terminal/utility: the tictactoe
+module itself, or an mnk.Game for bigger boards.
+
+The tree grows with UCT: select children by upper confidence bound, expand
+one untried move, then score it with random playouts and back the results
+up the path. Playouts are run in batches per expanded leaf, which shares
+the cost of selection among several samples. The search stops after a
+fixed number of playouts or a time budget, but always after at least one
+expansion so that a move can be returned, and can run independent trees
+in several processes (root parallelization) whose visit counts are summed.
+The worker processes are started once per player, not per move, so that
+only searching counts against the time budget.
+"""
+
+import importlib
+import math
+import random
+import time
+import types
+from concurrent.futures import ProcessPoolExecutor
+
+from tictactoe import X
+
+
+class Node():
+    __slots__ = ("board", "parent", "action", "mover", "children",
+                 "untried", "visits", "wins")
+
+    def __init__(self, game, board, parent, action, mover):
+        self.board = board
+        self.parent = parent
+        self.action = action
+
+        # Player who made `action`; wins are counted for them
+        self.mover = mover
+        self.children = []
+        self.untried = ([] if game.terminal(board)
+                        else sorted(game.actions(board)))
+        self.visits = 0
+        self.wins = 0.0
+
+
+class MCTS():
+    """
+    UCT player for `game` under a playout or time budget.
+    """
+
+    def __init__(self, game, playouts=2000, time_limit=None, batch_size=8,
+                 exploration=math.sqrt(2), processes=1, seed=None):
+        self.game = game
+        self.playouts = playouts
+        self.time_limit = time_limit
+        self.batch_size = batch_size
+        self.exploration = exploration
+        self.processes = processes
+        self.random = random.Random(seed)
+
+        # Statistics of the last best_move call
+        self.stats = {}
+
+        # Worker processes, started up front and kept for every move
+        self.executor = None
+        if processes > 1:
+            self.executor = ProcessPoolExecutor(processes)
+            self.executor.submit(int).result()
+
+    def close(self):
+        """
+        Shuts down the worker processes, if any.
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def best_move(self, board):
+        """
+        Returns the most visited move for the current player on the board,
+        or None if the game is over.
+        """
+        if self.game.terminal(board):
+            return None
+
+        start = time.perf_counter()
+        if self.processes > 1:
+            game = (self.game.__name__
+                    if isinstance(self.game, types.ModuleType) else self.game)
+            seeds = [self.random.randrange(2 ** 32)
+                     for _ in range(self.processes)]
+            share = -(-self.playouts // self.processes)
+            results = list(self.executor.map(
+                run_tree, [game] * self.processes, [board] * self.processes,
+                [share] * self.processes, [self.time_limit] * self.processes,
+                [self.batch_size] * self.processes,
+                [self.exploration] * self.processes, seeds))
+        else:
+            results = [self.grow(board, self.playouts, self.random)]
+
+        visits = {}
+        playouts = nodes = 0
+        for counts, tree_playouts, tree_nodes in results:
+            playouts += tree_playouts
+            nodes += tree_nodes
+            for action, count in counts.items():
+                visits[action] = visits.get(action, 0) + count
+
+        seconds = time.perf_counter() - start
+        self.stats = {
+            "playouts": playouts,
+            "nodes": nodes,
+            "seconds": seconds,
+            "playouts_per_second": playouts / seconds if seconds else 0.0,
+        }
+        return max(sorted(visits), key=visits.__getitem__)
+
+    def grow(self, board, playouts, rng):
+        """
+        Grows one search tree from `board`.
+
+        Returns (visit count of each root move, playouts run, tree size).
+        """
+        game = self.game
+        deadline = (None if self.time_limit is None
+                    else time.perf_counter() + self.time_limit)
+        root = Node(game, board, None, None, None)
+        done = nodes = 0
+
+        while True:
+            # The first iteration always runs, so the root has a child
+            if done and (done >= playouts if deadline is None
+                         else time.perf_counter() >= deadline):
+                break
+
+            # Selection
+            node = root
+            while not node.untried and node.children:
+                node = self.select(node)
+
+            # Expansion
+            if node.untried:
+                action = node.untried.pop(rng.randrange(len(node.untried)))
+                child = Node(game, game.result(node.board, action), node,
+                             action, game.player(node.board))
+                node.children.append(child)
+                node = child
+                nodes += 1
+
+            # Simulation, in a batch from the new leaf
+            scores = [self.playout(node.board, rng)
+                      for _ in range(self.batch_size)]
+            done += self.batch_size
+
+            # Backpropagation
+            while node is not None:
+                node.visits += len(scores)
+                if node.mover is not None:
+                    node.wins += sum(
+                        score if node.mover == X else 1 - score
+                        for score in scores
+                    )
+                node = node.parent
+
+        counts = {child.action: child.visits for child in root.children}
+        return counts, done, nodes
+
+    def select(self, node):
+        """
+        Returns the child of `node` with the highest UCT score.
+        """
+        log_visits = math.log(node.visits)
+        return max(node.children, key=lambda child: (
+            child.wins / child.visits
+            + self.exploration * math.sqrt(log_visits / child.visits)
+        ))
+
+    def playout(self, board, rng):
+        """
+        Plays random moves from `board` to the end of the game.
+
+        Returns 1 if X wins, 0 if O wins and 0.5 for a tie. Games that
+        provide their own (faster) playout, like mnk.Game, use it instead.
+        """
+        game = self.game
+        if hasattr(game, "playout"):
+            return game.playout(board, rng)
+        while not game.terminal(board):
+            board = game.result(board, rng.choice(sorted(game.actions(board))))
+        return (game.utility(board) + 1) / 2
+
+
+def run_tree(game, board, playouts, time_limit, batch_size, exploration,
+             seed):
+    """
+    Grows one tree in a worker process; see MCTS.grow.
+
+    A game given by module name is imported here, as modules cannot be
+    sent between processes.
+    """
+    if isinstance(game, str):
+        game = importlib.import_module(game)
+    player = MCTS(game, playouts, time_limit, batch_size, exploration)
+    return player.grow(board, playouts, random.Random(seed))
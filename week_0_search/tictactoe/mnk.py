@@ -0,0 +1,329 @@
+"""
+Generalized m,n,k Player
+
+The same initial_state/player/actions/result/winner/terminal/utility/
+minimax interface as tictactoe.py, for boards of any size where a player
+needs k in a row (4x4, 5x5, connect-k, ...). Those game trees are far too
+big for plain minimax, so minimax here runs iterative-deepening alpha-beta
+with move ordering and a transposition table, scores unfinished positions
+with a heuristic, and returns the best move found within a time budget.
+"""
+
+import math
+import time
+
+from tictactoe import X, O, EMPTY
+
+# Default time budget for a move, in seconds
+DEFAULT_TIME_LIMIT = 1.0
+
+# Bounds stored with transposition table values
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Cell values used inside the search
+PIECES = {X: 1, O: -1, EMPTY: 0}
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class Game():
+    """
+    An m,n,k game: `rows` x `cols` board, `k` in a row wins.
+    """
+
+    def __init__(self, rows=3, cols=3, k=3, time_limit=DEFAULT_TIME_LIMIT):
+        if rows < 1 or cols < 1 or not 1 <= k <= max(rows, cols):
+            raise ValueError(f"no {k} in a row on a {rows}x{cols} board")
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.time_limit = time_limit
+
+        # Every line of k cells, as flat cell indices, and the lines
+        # through each cell
+        self.windows = []
+        for i in range(rows):
+            for j in range(cols):
+                for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_i, end_j = i + di * (k - 1), j + dj * (k - 1)
+                    if 0 <= end_i < rows and 0 <= end_j < cols:
+                        self.windows.append(tuple(
+                            (i + di * step) * cols + j + dj * step
+                            for step in range(k)
+                        ))
+        self.cell_windows = [[] for _ in range(rows * cols)]
+        for window in self.windows:
+            for cell in window:
+                self.cell_windows[cell].append(window)
+
+        # Cells closest to the middle of the board come first by default
+        middle_i, middle_j = (rows - 1) / 2, (cols - 1) / 2
+        self.central_order = sorted(
+            range(rows * cols),
+            key=lambda cell: (abs(cell // cols - middle_i)
+                              + abs(cell % cols - middle_j))
+        )
+
+        # A win outweighs any sum of heuristic line scores
+        self.win_score = 10 ** (k + 1) * (len(self.windows) + 1)
+
+        # Search state, reset by each minimax call
+        self.deadline = math.inf
+        self.nodes = 0
+        self.table = {}
+        self.history = [0] * (rows * cols)
+
+        # Statistics of the last minimax call
+        self.stats = {}
+
+    def initial_state(self):
+        """
+        Returns starting state of the board.
+        """
+        return [[EMPTY] * self.cols for _ in range(self.rows)]
+
+    def player(self, board):
+        """
+        Returns player who has the next turn on a board.
+        """
+        num_x = sum(row.count(X) for row in board)
+        num_o = sum(row.count(O) for row in board)
+        return X if num_x == num_o else O
+
+    def actions(self, board):
+        """
+        Returns set of all possible actions (i, j) available on the board.
+        """
+        return {(i, j) for i, row in enumerate(board)
+                for j, cell in enumerate(row) if cell == EMPTY}
+
+    def result(self, board, action):
+        """
+        Returns the board that results from making move (i, j) on the board.
+        """
+        i, j = action
+        if not (0 <= i < self.rows and 0 <= j < self.cols) or (
+            board[i][j] != EMPTY
+        ):
+            raise ValueError(f"({i}, {j}) is not a valid move")
+        board_copy = [row.copy() for row in board]
+        board_copy[i][j] = self.player(board)
+        return board_copy
+
+    def winner(self, board):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        cells = self.flatten(board)
+        for window in self.windows:
+            first = cells[window[0]]
+            if first and all(cells[cell] == first for cell in window):
+                return X if first == 1 else O
+        return None
+
+    def terminal(self, board):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        return self.winner(board) is not None or all(
+            cell != EMPTY for row in board for cell in row
+        )
+
+    def utility(self, board):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        return {X: 1, O: -1, None: 0}[self.winner(board)]
+
+    def flatten(self, board):
+        """
+        Returns the board as a flat list of 1 (X), -1 (O) and 0 (empty).
+        """
+        return [PIECES[cell] for row in board for cell in row]
+
+    def evaluate(self, cells):
+        """
+        Returns a heuristic score of a flat board, from X's point of view.
+
+        Every line that only one player has pieces in counts for that
+        player, ten times more for each piece they have in it.
+        """
+        score = 0
+        for window in self.windows:
+            xs = os = 0
+            for cell in window:
+                value = cells[cell]
+                if value == 1:
+                    xs += 1
+                elif value == -1:
+                    os += 1
+            if xs and not os:
+                score += 10 ** xs
+            elif os and not xs:
+                score -= 10 ** os
+        return score
+
+    def completes_line(self, cells, cell):
+        """
+        Returns True if the piece on `cell` is part of k in a row.
+        """
+        piece = cells[cell]
+        return any(all(cells[other] == piece for other in window)
+                   for window in self.cell_windows[cell])
+
+    def playout(self, board, rng):
+        """
+        Plays random moves from `board` to the end of the game.
+
+        Returns 1 if X wins, 0 if O wins and 0.5 for a tie. Works on the
+        flat board and only checks the lines through each new piece, which
+        makes it much cheaper than playing through result and terminal.
+        """
+        if self.terminal(board):
+            return (self.utility(board) + 1) / 2
+        cells = self.flatten(board)
+        color = 1 if self.player(board) == X else -1
+        empty = [cell for cell, value in enumerate(cells) if value == 0]
+        rng.shuffle(empty)
+        for cell in empty:
+            cells[cell] = color
+            if self.completes_line(cells, cell):
+                return 1.0 if color == 1 else 0.0
+            color = -color
+        return 0.5
+
+    def minimax(self, board, time_limit=None):
+        """
+        Returns the best action found for the current player on the board
+        within `time_limit` seconds (the game's default if None).
+
+        Searches one ply deeper at a time and returns the best move of the
+        deepest search that finished, so even a short budget yields a move.
+        """
+        if self.terminal(board):
+            return None
+        if time_limit is None:
+            time_limit = self.time_limit
+
+        start = time.perf_counter()
+        self.deadline = start + time_limit
+        self.nodes = 0
+        self.table = {}
+        self.history = [0] * (self.rows * self.cols)
+
+        cells = self.flatten(board)
+        color = 1 if self.player(board) == X else -1
+        empty = cells.count(0)
+        moves = self.ordered_moves(cells, None)
+        best_move, depth_reached = moves[0], 0
+
+        for depth in range(1, empty + 1):
+            try:
+                value, move = self.search_root(cells, depth, color, best_move)
+            except SearchTimeout:
+                break
+            best_move, depth_reached = move, depth
+            # A forced result will not change with deeper searches
+            if abs(value) >= self.win_score - empty:
+                break
+
+        elapsed = time.perf_counter() - start
+        self.stats = {
+            "depth": depth_reached,
+            "nodes": self.nodes,
+            "seconds": elapsed,
+            "nodes_per_second": self.nodes / elapsed if elapsed else 0.0,
+        }
+        return divmod(best_move, self.cols)
+
+    def search_root(self, cells, depth, color, first):
+        """
+        Returns (value, move) of a depth-limited search from the root.
+        """
+        alpha, beta = -math.inf, math.inf
+        best_value, best_move = -math.inf, None
+        for move in self.ordered_moves(cells, first):
+            cells[move] = color
+            try:
+                value = -self.negamax(cells, depth - 1, -beta, -alpha,
+                                      -color, move, 1)
+            finally:
+                cells[move] = 0
+            if value > best_value:
+                best_value, best_move = value, move
+            alpha = max(alpha, value)
+        return best_value, best_move
+
+    def negamax(self, cells, depth, alpha, beta, color, last, ply):
+        """
+        Returns the value of a flat board for `color`, the player to move,
+        searching `depth` more plies with alpha-beta pruning.
+        """
+        self.nodes += 1
+        if self.nodes & 1023 == 0 and time.perf_counter() > self.deadline:
+            raise SearchTimeout
+
+        # Only the player who just moved can have won; quicker wins
+        # score higher
+        if self.completes_line(cells, last):
+            return -(self.win_score - ply)
+        if 0 not in cells:
+            return 0
+        if depth == 0:
+            return color * self.evaluate(cells)
+
+        key = tuple(cells)
+        entry = self.table.get(key)
+        table_move = None
+        if entry is not None:
+            entry_depth, value, bound, table_move = entry
+            if entry_depth >= depth:
+                if bound == EXACT:
+                    return value
+                elif bound == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        original_alpha = alpha
+        best_value, best_move = -math.inf, None
+        for move in self.ordered_moves(cells, table_move):
+            cells[move] = color
+            try:
+                value = -self.negamax(cells, depth - 1, -beta, -alpha,
+                                      -color, move, ply + 1)
+            finally:
+                cells[move] = 0
+            if value > best_value:
+                best_value, best_move = value, move
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                self.history[move] += depth * depth
+                break
+
+        if best_value <= original_alpha:
+            bound = UPPER
+        elif best_value >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.table[key] = (depth, best_value, bound, best_move)
+        return best_value
+
+    def ordered_moves(self, cells, first):
+        """
+        Returns the empty cells of a flat board, most promising first:
+        `first` (if given), then by history of causing cutoffs, then the
+        most central.
+        """
+        history = self.history
+        moves = [cell for cell in self.central_order if cells[cell] == 0]
+        moves.sort(key=lambda cell: -history[cell])
+        if first is not None and first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
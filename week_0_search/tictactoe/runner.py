@@ -1,6 +1,7 @@
 import pygame
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import tictactoe as ttt
 
@@ -13,13 +14,24 @@ white = (255, 255, 255)
 
 screen = pygame.display.set_mode(size)
 
+smallFont = pygame.font.Font("OpenSans-Regular.ttf", 16)
 mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
 moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
+# Frames per second, and the least time the computer appears to think
+fps = 30
+min_think_time = 0.5
+
+# The AI searches on a worker thread so the window keeps redrawing and
+# handling events while it thinks
+executor = ThreadPoolExecutor(max_workers=1)
+clock = pygame.time.Clock()
+
 user = None
 board = ttt.initial_state()
-ai_turn = False
+ai_search = None
+ai_stats = None
 
 while True:
 
@@ -110,13 +122,30 @@ while True:
 
         # Check for AI move
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
+            if ai_search is None:
+                ai_search = (executor.submit(ttt.minimax, board),
+                             board, time.time())
+            else:
+                future, searched_board, started = ai_search
+                if future.done() and time.time() - started >= min_think_time:
+                    move = future.result()
+                    ai_search = None
+                    if searched_board is board:
+                        board = ttt.result(board, move)
+                        ai_stats = dict(ttt.stats)
+
+        # Show statistics of the last AI search
+        if ai_stats is not None:
+            if ai_stats["source"] == "book":
+                text = "Last move: opening book"
             else:
-                ai_turn = True
+                text = (f"Last move: {ai_stats['nodes']} nodes, "
+                        f"depth {ai_stats['depth']}, "
+                        f"{ai_stats['nodes_per_second']:,.0f} nodes/s")
+            statsText = smallFont.render(text, True, white)
+            statsRect = statsText.get_rect()
+            statsRect.center = ((width / 2), 68)
+            screen.blit(statsText, statsRect)
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -141,6 +170,8 @@ while True:
                     time.sleep(0.2)
                     user = None
                     board = ttt.initial_state()
-                    ai_turn = False
+                    ai_search = None
+                    ai_stats = None
 
     pygame.display.flip()
+    clock.tick(fps)
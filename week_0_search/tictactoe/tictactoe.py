@@ -3,21 +3,28 @@ Tic Tac Toe Player
 """
 
 import math
-import copy
+import time
+
+import bitboard
+import book
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Bounds stored with transposition table values
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Maps canonical bitboard keys to (value, bound) from previous searches
+transposition_table = {}
 
-def count_in_list_of_lists(list_of_lists, obj):
-    counter = 0
-    for list_0 in list_of_lists:
-        for item in list_0:
-            if item == obj:
-                counter += 1
+# Statistics of the last minimax call: where the move came from ("book"
+# or "search"), nodes searched, deepest ply reached, and timings
+stats = {}
 
-    return counter
+# Counters updated by alphabeta during a search
+nodes_searched = 0
+deepest_ply = 0
 
 
 def initial_state():
@@ -33,14 +40,7 @@ def player(board):
     """
     Returns player who has the next turn on a board.
     """
-
-    num_x = count_in_list_of_lists(board, X)
-
-    num_o = count_in_list_of_lists(board, O)
-
-    if num_x == num_o:
-        return X
-    return O
+    return bitboard.player(bitboard.from_board(board))
 
 
 def actions(board):
@@ -72,7 +72,7 @@ def result(board, action):
     if place != EMPTY:
         raise ValueError(f"({i}, {j}) is not a valid move")
 
-    board_copy = copy.deepcopy(board)
+    board_copy = [row.copy() for row in board]
     board_copy[i][j] = current_player
 
     return board_copy
@@ -81,121 +81,126 @@ def result(board, action):
 def winner(board):
     """
     Returns the winner of the game, if there is one.
-    # """
-    for player in (X, O):
-        # column:
-        for row in board:
-            if row == [player] * 3:
-                return player
-        # row:
-        for i in range(3):
-            column = [board[x][i] for x in range(3)]
-            if column == [player] * 3:
-                return player
-
-        # diagonal:
-        if [board[i][i] for i in range(0, 3)] == [player] * 3:
-            return player
-
-        elif [board[i][~i] for i in range(0, 3)] == [player] * 3:
-            return player
-
-    return None
-
-
-def is_tie(board):
-    count_empty = 9
-    for i in board:
-        for j in i:
-            if j != EMPTY:
-                count_empty -= 1
-    return count_empty == 0
+    """
+    return bitboard.winner(bitboard.from_board(board))
 
 
 def terminal(board):
     """
     Returns True if game is over, False otherwise.
     """
-    if winner(board) or is_tie(board):
-        return True
-
-    return False
+    return bitboard.terminal(bitboard.from_board(board))
 
 
 def utility(board):
     """
     Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
     """
-
-    if winner(board) == X:
-        return 1
-    elif winner(board) == O:
-        return -1
-    else:
-        return 0
+    return bitboard.utility(bitboard.from_board(board))
 
 
 def minimax(board):
     """
     Returns the optimal action for the current player on the board.
+
+    The move comes from the opening book when there is one (see book.py),
+    and from a search on the bitboard form of the board otherwise.
     """
-    if terminal(board) == True:
+    global stats, nodes_searched, deepest_ply
+    state = bitboard.from_board(board)
+    if bitboard.terminal(state):
         return None
 
-    else:
-        if player(board) == X:
-
-            value, move = get_min_board_state(board)
-            return move
+    start = time.perf_counter()
+    nodes_searched = deepest_ply = 0
+    move = book.lookup(state)
+    source = "book"
+    if move is None:
+        move = search(state)
+        source = "search"
+
+    seconds = time.perf_counter() - start
+    stats = {
+        "source": source,
+        "nodes": nodes_searched,
+        "depth": deepest_ply,
+        "seconds": seconds,
+        "nodes_per_second": nodes_searched / seconds if seconds else 0.0,
+        "cached": len(transposition_table),
+    }
+    return move
+
+
+def search(state):
+    """
+    Returns the optimal action for the current player on a bitboard.
+    """
+    maximizing = bitboard.player(state) == X
+    alpha, beta = -math.inf, math.inf
+    best_value, best_move = None, None
+    for action in bitboard.actions(state):
+        value = alphabeta(bitboard.result(state, action), alpha, beta, 1)
+        if best_value is None or (
+            value > best_value if maximizing else value < best_value
+        ):
+            best_value, best_move = value, action
+        if maximizing:
+            alpha = max(alpha, value)
         else:
-            value, move = get_max_board_state(board)
-            return move
+            beta = min(beta, value)
+    return best_move
 
 
-def get_max_board_state(board):
-    """
-    Returns the maximum value of a board and the best associated move
+def alphabeta(state, alpha, beta, ply=1):
     """
-    if terminal(board) == True:
-        return utility(board), 'returned Max'
-
-    v = -10000000000000000000000000000000000
-    move = None
-    for action in actions(board):
-        # remember, we are trying to see what the other player would do
-        # it's greedy
-        # and play to that response
-
-        min_val, min_action = get_min_board_state(result(board, action))
+    Returns the minimax value of a bitboard `ply` moves below the root,
+    searching with alpha-beta pruning.
 
-        if min_val > v:
-            v = min_val
-            move = min_action
-
-            return v, move
-
-
-def get_min_board_state(board):
-    """
-    Returns the minimum value of a board and the best associated move
+    The result is exact when it lies strictly between alpha and beta;
+    otherwise it is only a bound on the true value. Results are stored in
+    the transposition table, under the board's canonical key, along with
+    which of the two they are.
     """
-    if terminal(board) == True:
-        return utility(board), 'returned min'
+    global nodes_searched, deepest_ply
+    nodes_searched += 1
+    deepest_ply = max(deepest_ply, ply)
+    if bitboard.terminal(state):
+        return bitboard.utility(state)
 
-    v = 1000000000000000000000000000
-    move = None
-    for action in actions(board):
-        # remember, we are trying to see what the other player would do
-        # it's greedy
-        # and play to that response
-
-        min_val, min_action = get_max_board_state(result(board, action))
-
-        if min_val < v:
-            v = min_val
-            move = min_action
-
-            # if v == -1:
-            return v, move
-
-    # return v, move
+    key = bitboard.canonical(state)
+    if key in transposition_table:
+        value, bound = transposition_table[key]
+        if bound == EXACT:
+            return value
+        elif bound == LOWER:
+            alpha = max(alpha, value)
+        else:
+            beta = min(beta, value)
+        if alpha >= beta:
+            return value
+
+    original_alpha, original_beta = alpha, beta
+    if bitboard.player(state) == X:
+        value = -math.inf
+        for action in bitboard.actions(state):
+            child = bitboard.result(state, action)
+            value = max(value, alphabeta(child, alpha, beta, ply + 1))
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+    else:
+        value = math.inf
+        for action in bitboard.actions(state):
+            child = bitboard.result(state, action)
+            value = min(value, alphabeta(child, alpha, beta, ply + 1))
+            beta = min(beta, value)
+            if alpha >= beta:
+                break
+
+    if value <= original_alpha:
+        transposition_table[key] = (value, UPPER)
+    elif value >= original_beta:
+        transposition_table[key] = (value, LOWER)
+    else:
+        transposition_table[key] = (value, EXACT)
+    return value
@@ -0,0 +1,190 @@
+"""
+Benchmark for the model checking methods in logic.py.
+
+Usage: python benchmark.py [--repeat N] [--people P]
+                           [--parallel P [P ...]] [--processes W] [--json]
+
+Asks every puzzle in puzzle.py whether each character is a knight or a
+knave, N times over, with each model checking method, and checks that the
+methods agree. The "kb" method keeps one KnowledgeBase per puzzle across
+all queries and repeats; the others start from scratch every time. With
+--people P, also times one query against a synthetic knights-and-knaves
+chain of P characters (2P symbols), in which each one says the next is a
+knave. With --parallel, times sequential against parallel enumeration on
+chains of each size, for a query the chain entails (so that every model
+is checked) and one it does not (so that workers are cancelled early),
+and reports the speedup. Reports wall time per method, as text or (with
+--json) as one JSON object.
+"""
+
+import argparse
+import json
+import time
+
+import puzzle
+from logic import (And, Biconditional, KnowledgeBase, Not, Or, Symbol,
+                   entails, model_check)
+
+
+METHODS = {
+    "evaluate": lambda knowledge, query: model_check(knowledge, query,
+                                                     method="evaluate"),
+    "enumerate": lambda knowledge, query: model_check(knowledge, query,
+                                                      method="enumerate"),
+    "bitset": lambda knowledge, query: model_check(knowledge, query,
+                                                   method="bitset"),
+    "entails": entails,
+    "kb": lambda knowledge, query: knowledge_base(knowledge).entails(query),
+}
+
+PUZZLES = [puzzle.knowledge0, puzzle.knowledge1,
+           puzzle.knowledge2, puzzle.knowledge3]
+
+SYMBOLS = [puzzle.AKnight, puzzle.AKnave, puzzle.BKnight,
+           puzzle.BKnave, puzzle.CKnight, puzzle.CKnave]
+
+
+# KnowledgeBase objects by knowledge, kept across queries and repeats
+knowledge_bases = {}
+
+
+def knowledge_base(knowledge):
+    """
+    Returns the KnowledgeBase for `knowledge`, building it on first use.
+    """
+    if knowledge not in knowledge_bases:
+        knowledge_bases[knowledge] = KnowledgeBase(knowledge)
+    return knowledge_bases[knowledge]
+
+
+def chain(people):
+    """
+    Returns (knowledge, query) for a chain of `people` characters where
+    each says "the next one is a knave"; the query is that the first is
+    a knight, which the knowledge does not decide.
+    """
+    knights = [Symbol(f"{i} is a Knight") for i in range(people)]
+    knaves = [Symbol(f"{i} is a Knave") for i in range(people)]
+    sentences = []
+    for knight, knave in zip(knights, knaves):
+        sentences.append(Or(knight, knave))
+        sentences.append(Not(And(knight, knave)))
+    for i in range(people - 1):
+        sentences.append(Biconditional(knights[i], knaves[i + 1]))
+    return And(*sentences), knights[0]
+
+
+def compare_parallel(people, processes):
+    """
+    Returns sequential and parallel model checking times, and the speedup,
+    on a chain of `people` characters for an entailed and a non-entailed
+    query. Both go through model_check, so both simplify the knowledge
+    the same way before enumerating.
+    """
+    knowledge, undecided = chain(people)
+    entailed = Or(Symbol("0 is a Knight"), Symbol("0 is a Knave"))
+    results = {"people": people, "symbols": 2 * people}
+    for name, query in (("entailed", entailed), ("undecided", undecided)):
+        start = time.perf_counter()
+        expected = model_check(knowledge, query)
+        sequential = time.perf_counter() - start
+        start = time.perf_counter()
+        answer = model_check(knowledge, query, method="parallel",
+                             processes=processes)
+        parallel = time.perf_counter() - start
+        if answer != expected:
+            raise AssertionError("parallel disagrees with enumerate")
+        results[name] = {
+            "answer": answer,
+            "sequential_seconds": sequential,
+            "parallel_seconds": parallel,
+            "speedup": sequential / parallel,
+        }
+    return results
+
+
+def time_method(method, queries, repeat):
+    """
+    Returns (seconds, answers) for running `method` on every
+    (knowledge, query) pair, `repeat` times over.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        answers = [method(knowledge, query) for knowledge, query in queries]
+    return time.perf_counter() - start, answers
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark model checking methods.")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--people", type=int, default=0,
+                        help="also time a synthetic chain of this many "
+                             "characters")
+    parser.add_argument("--parallel", type=int, nargs="+", default=[],
+                        metavar="P",
+                        help="compare parallel model checking on chains "
+                             "of these sizes")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="worker processes for --parallel "
+                             "(default: one per CPU)")
+    parser.add_argument("--json", action="store_true",
+                        help="print the results as JSON")
+    args = parser.parse_args()
+
+    queries = [(knowledge, symbol)
+               for knowledge in PUZZLES for symbol in SYMBOLS]
+    results = {"repeat": args.repeat, "puzzles": {}, "chain": {}}
+    expected = None
+    for name, method in METHODS.items():
+        seconds, answers = time_method(method, queries, args.repeat)
+        if expected is None:
+            expected = answers
+        elif answers != expected:
+            raise AssertionError(f"{name} disagrees with evaluate")
+        results["puzzles"][name] = seconds
+
+    if args.people:
+        results["people"] = args.people
+        knowledge, query = chain(args.people)
+        expected = None
+        for name, method in METHODS.items():
+            seconds, (answer,) = time_method(method, [(knowledge, query)], 1)
+            if expected is None:
+                expected = answer
+            elif answer != expected:
+                raise AssertionError(f"{name} disagrees with evaluate")
+            results["chain"][name] = seconds
+
+    results["parallel"] = [compare_parallel(people, args.processes)
+                           for people in args.parallel]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    baseline = results["puzzles"]["evaluate"]
+    print(f"Puzzles: {len(queries)} queries, {args.repeat} times over")
+    for name, seconds in results["puzzles"].items():
+        print(f"    {name:10} {seconds:8.3f}s  "
+              f"({baseline / seconds:.1f}x evaluate)")
+    if results["chain"]:
+        baseline = results["chain"]["evaluate"]
+        print(f"Chain of {args.people} characters "
+              f"({2 * args.people} symbols): 1 query")
+        for name, seconds in results["chain"].items():
+            print(f"    {name:10} {seconds:8.3f}s  "
+                  f"({baseline / seconds:.1f}x evaluate)")
+    for comparison in results["parallel"]:
+        print(f"Parallel, chain of {comparison['people']} characters "
+              f"({comparison['symbols']} symbols):")
+        for name in ("entailed", "undecided"):
+            timing = comparison[name]
+            print(f"    {name:10} sequential "
+                  f"{timing['sequential_seconds']:8.3f}s  parallel "
+                  f"{timing['parallel_seconds']:8.3f}s  "
+                  f"({timing['speedup']:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
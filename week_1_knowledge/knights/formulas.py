@@ -0,0 +1,213 @@
+"""
+Text formats for logic sentences.
+
+parse reads the notation Sentence.formula() writes: ¬ for not, ∧ for and,
+∨ for or, => for implication and <=> for biconditional, ⊤ and ⊥ for the
+constants true and false, with parentheses for grouping. Symbol names run
+up to the next operator or parenthesis and may contain spaces, as in
+"A is a Knight". Without parentheses ¬ binds tightest, then ∧, ∨, => and
+<=>; => groups to the right, and a run of ∧ or of ∨ becomes one n-ary And
+or Or, so parse(s.formula()) gives back s (except that an And or Or of a
+single sentence is that sentence).
+
+read_formulas and write_formulas store one sentence per line, and
+read_dimacs and write_dimacs use the DIMACS CNF format of SAT solvers.
+Every reader streams its input and every parser loop is iterative, so
+knowledge bases with hundreds of thousands of clauses load without
+holding the text in memory or recursing.
+"""
+
+import re
+
+from logic import (FALSE, TRUE, And, Biconditional, ClauseList, CNFEncoder,
+                   Implication, Not, Or, Symbol)
+
+# Operators, or a symbol name: non-space characters other than operators
+# and parentheses, with single runs of spaces allowed between them
+TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<operator><=>|=>|¬|∧|∨|⊤|⊥|\(|\))
+      | (?P<name>(?:(?!<=>|=>)[^¬∧∨⊤⊥()\s])+
+                 (?:\s+(?:(?!<=>|=>)[^¬∧∨⊤⊥()\s])+)*)
+    )
+""", re.VERBOSE)
+
+# Constants by token
+CONSTANTS = {"⊤": TRUE, "⊥": FALSE}
+
+# Binary operators by token: (precedence, groups to the right, class)
+BINARY = {
+    "<=>": (1, False, Biconditional),
+    "=>": (2, True, Implication),
+    "∨": (3, False, Or),
+    "∧": (4, False, And),
+}
+
+# Comment line that write_dimacs uses to record the name of a variable
+DIMACS_NAME = re.compile(r"c var (\d+) (.*)")
+
+
+class ParseError(ValueError):
+    """A formula that cannot be parsed, with the column of the problem."""
+
+    def __init__(self, message, text, column):
+        super().__init__(f"{message} at column {column + 1}: {text!r}")
+        self.column = column
+
+
+def tokenize(text):
+    """Yields (column, operator, name) for each token of text."""
+    position = 0
+    end = len(text.rstrip())
+    while position < end:
+        match = TOKEN.match(text, position)
+        if match is None or match.end() == position:
+            column = len(text) - len(text[position:].lstrip())
+            raise ParseError("unexpected character", text, column)
+        yield match.start(match.lastgroup), match["operator"], match["name"]
+        position = match.end()
+
+
+def parse(text):
+    """Parses one formula into a Sentence."""
+    # Operands are [sentence, None], or [children, token] for an n-ary
+    # And or Or that a further ∧ or ∨ may still extend
+    operands = []
+    operators = []
+    expect_operand = True
+
+    def close(operand):
+        sentence, token = operand
+        return sentence if token is None else BINARY[token][2](*sentence)
+
+    def reduce():
+        token = operators.pop()
+        right = close(operands.pop())
+        left = operands[-1]
+        if token in ("∧", "∨") and left[1] == token:
+            left[0].append(right)
+        elif token in ("∧", "∨"):
+            operands[-1] = [[close(left), right], token]
+        else:
+            operands[-1] = [BINARY[token][2](close(left), right), None]
+
+    def negate():
+        while operators and operators[-1] == "¬":
+            operators.pop()
+            operands[-1] = [Not(close(operands[-1])), None]
+
+    column = 0
+    for column, operator, name in tokenize(text):
+        if expect_operand:
+            if name is not None or operator in CONSTANTS:
+                operands.append([
+                    Symbol(name) if name is not None else CONSTANTS[operator],
+                    None
+                ])
+                negate()
+                expect_operand = False
+            elif operator in ("¬", "("):
+                operators.append(operator)
+            else:
+                raise ParseError("expected a formula", text, column)
+        elif operator == ")":
+            while operators and operators[-1] != "(":
+                reduce()
+            if not operators:
+                raise ParseError("unmatched ')'", text, column)
+            operators.pop()
+            operands[-1] = [close(operands[-1]), None]
+            negate()
+        elif operator in BINARY:
+            precedence, right, _ = BINARY[operator]
+            while operators and operators[-1] in BINARY:
+                top = BINARY[operators[-1]][0]
+                if top < precedence or (top == precedence and right):
+                    break
+                reduce()
+            operators.append(operator)
+            expect_operand = True
+        else:
+            raise ParseError("expected an operator", text, column)
+
+    if expect_operand:
+        raise ParseError("expected a formula", text, len(text))
+    while operators:
+        if operators[-1] == "(":
+            raise ParseError("unmatched '('", text, column)
+        reduce()
+    return close(operands[0])
+
+
+def read_formulas(stream):
+    """
+    Yields the sentence on each line of stream, skipping blank lines and
+    lines starting with #.
+    """
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield parse(line)
+
+
+def write_formulas(sentences, stream):
+    """Writes each of sentences to stream as one line."""
+    for sentence in sentences:
+        stream.write(sentence.formula() + "\n")
+
+
+def read_dimacs(stream, names=None):
+    """
+    Yields each clause of a DIMACS CNF file as an Or of literals.
+
+    Variable v becomes Symbol(names[v]) if names maps it, otherwise the
+    symbol named by a "c var v name" comment from write_dimacs, otherwise
+    Symbol(str(v)). Reading stops at a "%" line, which ends the clauses in
+    SATLIB files (they follow it with a stray "0").
+    """
+    names = {} if names is None else dict(names)
+    literals = {}
+    clause = []
+    for line in stream:
+        line = line.strip()
+        if line.startswith("c"):
+            match = DIMACS_NAME.match(line)
+            if match:
+                names.setdefault(int(match[1]), match[2])
+            continue
+        if line.startswith("%"):
+            break
+        if line.startswith("p"):
+            continue
+        for field in line.split():
+            literal = int(field)
+            if literal == 0:
+                yield Or(*clause)
+                clause = []
+                continue
+            if literal not in literals:
+                symbol = Symbol(names.get(abs(literal), str(abs(literal))))
+                literals[literal] = symbol if literal > 0 else Not(symbol)
+            clause.append(literals[literal])
+    if clause:
+        yield Or(*clause)
+
+
+def write_dimacs(sentence, stream):
+    """
+    Writes sentence to stream in DIMACS CNF format.
+
+    Sentences already in conjunctive normal form are written clause for
+    clause; others are Tseitin-encoded, with extra variables for their
+    compound subsentences. Each symbol's variable is recorded in a
+    "c var v name" comment, which read_dimacs understands.
+    """
+    encoder = CNFEncoder(ClauseList())
+    encoder.add(sentence)
+    clauses = encoder.solver.clauses
+    for name, variable in sorted(encoder.variables.items(),
+                                 key=lambda item: item[1]):
+        stream.write(f"c var {variable} {name}\n")
+    stream.write(f"p cnf {encoder.solver.num_vars} {len(clauses)}\n")
+    for clause in clauses:
+        stream.write(" ".join(map(str, sorted(clause, key=abs))) + " 0\n")
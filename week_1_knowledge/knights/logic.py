@@ -1,7 +1,66 @@
 import itertools
+import math
+import multiprocessing
+import os
+import weakref
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import sat
 
 
 class Sentence():
+    """A logical sentence.
+
+    Sentences are immutable and interned: constructing a sentence that is
+    structurally equal to a live one returns that same object, so equality
+    is identity, hashes are computed once, and shared subsentences are
+    stored once.
+    """
+
+    __slots__ = ("_key", "_hash", "_symbols", "_compiled", "_facts",
+                 "__weakref__")
+
+    # Live sentences by (class, arguments)
+    _interned = weakref.WeakValueDictionary()
+
+    @classmethod
+    def intern(cls, arguments, **fields):
+        """Returns the unique sentence of this class with these arguments."""
+        key = (cls, arguments)
+        sentence = Sentence._interned.get(key)
+        if sentence is None:
+            sentence = object.__new__(cls)
+            object.__setattr__(sentence, "_key", key)
+            object.__setattr__(sentence, "_hash",
+                               hash((cls.__name__, arguments)))
+            object.__setattr__(sentence, "_symbols", None)
+            object.__setattr__(sentence, "_compiled", None)
+            object.__setattr__(sentence, "_facts", None)
+            for name, value in fields.items():
+                object.__setattr__(sentence, name, value)
+            Sentence._interned[key] = sentence
+        return sentence
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __eq__(self, other):
+        return self is other
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return (type(self), self._key[1])
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
@@ -11,9 +70,104 @@ class Sentence():
         """Returns string formula representing logical sentence."""
         return ""
 
+    def children(self):
+        """Returns the immediate subsentences of the logical sentence."""
+        return ()
+
+    def expression(self, positions, operands):
+        """Returns Python source evaluating this node, or None if unsupported.
+
+        positions maps symbol names to indices into a tuple named values;
+        operands holds the source of each child, in order.
+        """
+        return None
+
+    def compile(self, symbols):
+        """Compiles the logical sentence into a function of truth values.
+
+        The function takes a tuple of booleans, one per name in symbols and
+        in the same order, and returns whether the sentence is true in that
+        model. Sentences nested too deeply for the Python parser run as
+        truth table programs instead, and sentences with unknown node types
+        are evaluated through a model dictionary. The most recently
+        compiled function is kept on the sentence for reuse.
+        """
+        symbols = tuple(symbols)
+        if self._compiled is not None and self._compiled[0] == symbols:
+            return self._compiled[1]
+        function = self.compile_function(symbols)
+        object.__setattr__(self, "_compiled", (symbols, function))
+        return function
+
+    def compile_function(self, symbols):
+        """Builds the function returned by compile.
+
+        Compound subsentences with several parents are computed once into
+        local variables, so the source grows with the number of distinct
+        subsentences rather than with the size of the unshared tree.
+        """
+        positions = {name: i for i, name in enumerate(symbols)}
+
+        # Order the nodes children first, counting the parents of each
+        order = []
+        parents = {}
+        stack = [(self, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if node in parents:
+                continue
+            children = node.children()
+            if children and not children_done:
+                stack.append((node, True))
+                stack.extend((child, False) for child in children)
+                continue
+            parents[node] = 0
+            order.append(node)
+            for child in children:
+                parents[child] += 1
+
+        lines = []
+        expressions = {}
+        for node in order:
+            children = node.children()
+            source = node.expression(
+                positions, [expressions[child] for child in children]
+            )
+            if source is None:
+                return lambda values: self.evaluate(
+                    dict(zip(symbols, values))
+                )
+            if children and parents[node] > 1:
+                lines.append(f"    s{len(lines)} = {source}")
+                source = f"s{len(lines) - 1}"
+            expressions[node] = source
+        lines.append(f"    return {expressions[self]}")
+
+        namespace = {}
+        try:
+            exec("def function(values):\n" + "\n".join(lines), namespace)
+        except (SyntaxError, RecursionError, MemoryError):
+            program = truth_table_program(self, positions)
+            return lambda values: bool(run_truth_table(
+                program, [1 if value else 0 for value in values], 1
+            ))
+        return namespace["function"]
+
     def symbols(self):
-        """Returns a set of all symbols in the logical sentence."""
-        return set()
+        """Returns a frozenset of all symbols in the logical sentence."""
+        stack = [self]
+        while self._symbols is None:
+            node = stack[-1]
+            pending = [child for child in node.children()
+                       if child._symbols is None]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            object.__setattr__(node, "_symbols", frozenset().union(
+                *[child._symbols for child in node.children()]
+            ))
+        return self._symbols
 
     @classmethod
     def validate(cls, sentence):
@@ -43,15 +197,10 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name",)
 
-    def __init__(self, name):
-        self.name = name
-
-    def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
-
-    def __hash__(self):
-        return hash(("symbol", self.name))
+    def __new__(cls, name):
+        return cls.intern((name,), name=name, _symbols=frozenset((name,)))
 
     def __repr__(self):
         return self.name
@@ -65,20 +214,19 @@ class Symbol(Sentence):
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
+    def expression(self, positions, operands):
+        try:
+            return f"values[{positions[self.name]}]"
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
 
 
 class Not(Sentence):
-    def __init__(self, operand):
-        Sentence.validate(operand)
-        self.operand = operand
+    __slots__ = ("operand",)
 
-    def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
-
-    def __hash__(self):
-        return hash(("not", hash(self.operand)))
+    def __new__(cls, operand):
+        Sentence.validate(operand)
+        return cls.intern((operand,), operand=operand)
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -89,23 +237,20 @@ class Not(Sentence):
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
+    def children(self):
+        return (self.operand,)
+
+    def expression(self, positions, operands):
+        return f"(not {operands[0]})"
 
 
 class And(Sentence):
-    def __init__(self, *conjuncts):
+    __slots__ = ("conjuncts",)
+
+    def __new__(cls, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
-        self.conjuncts = list(conjuncts)
-
-    def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
-
-    def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+        return cls.intern(conjuncts, conjuncts=conjuncts)
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -114,8 +259,9 @@ class And(Sentence):
         return f"And({conjunctions})"
 
     def add(self, conjunct):
+        """Returns a new conjunction with conjunct appended."""
         Sentence.validate(conjunct)
-        self.conjuncts.append(conjunct)
+        return And(*self.conjuncts, conjunct)
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
@@ -126,23 +272,20 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def children(self):
+        return self.conjuncts
+
+    def expression(self, positions, operands):
+        return "(" + " and ".join(operands) + ")" if operands else "True"
 
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
+    __slots__ = ("disjuncts",)
+
+    def __new__(cls, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
-
-    def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
-
-    def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+        return cls.intern(disjuncts, disjuncts=disjuncts)
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -157,24 +300,21 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def children(self):
+        return self.disjuncts
+
+    def expression(self, positions, operands):
+        return "(" + " or ".join(operands) + ")" if operands else "False"
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
+    __slots__ = ("antecedent", "consequent")
+
+    def __new__(cls, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
-
-    def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
-
-    def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        return cls.intern((antecedent, consequent),
+                          antecedent=antecedent, consequent=consequent)
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -188,45 +328,236 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def children(self):
+        return (self.antecedent, self.consequent)
+
+    def expression(self, positions, operands):
+        return f"(not {operands[0]} or {operands[1]})"
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
+    __slots__ = ("left", "right")
+
+    def __new__(cls, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
-        self.left = left
-        self.right = right
-
-    def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
-
-    def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+        return cls.intern((left, right), left=left, right=right)
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
 
     def evaluate(self, model):
-        return ((self.left.evaluate(model)
-                 and self.right.evaluate(model))
-                or (not self.left.evaluate(model)
-                    and not self.right.evaluate(model)))
+        return self.left.evaluate(model) == self.right.evaluate(model)
 
     def formula(self):
-        left = Sentence.parenthesize(str(self.left))
-        right = Sentence.parenthesize(str(self.right))
+        left = Sentence.parenthesize(self.left.formula())
+        right = Sentence.parenthesize(self.right.formula())
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
+    def children(self):
+        return (self.left, self.right)
+
+    def expression(self, positions, operands):
+        return f"(bool({operands[0]}) == bool({operands[1]}))"
+
+
+class Constant(Sentence):
+    __slots__ = ("value",)
 
+    def __new__(cls, value):
+        value = bool(value)
+        return cls.intern((value,), value=value, _symbols=frozenset())
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+    def __repr__(self):
+        return f"Constant({self.value})"
+
+    def evaluate(self, model):
+        return self.value
+
+    def formula(self):
+        return "⊤" if self.value else "⊥"
+
+    def expression(self, positions, operands):
+        return repr(self.value)
+
+
+TRUE = Constant(True)
+FALSE = Constant(False)
+
+
+def negate(sentence):
+    """Returns the negation of sentence, without double negations."""
+    if isinstance(sentence, Constant):
+        return Constant(not sentence.value)
+    if isinstance(sentence, Not):
+        return sentence.operand
+    return Not(sentence)
+
+
+def junction(cls, operands):
+    """Returns a simplified And or Or (cls) of operands.
+
+    Nested sentences of the same class are flattened, duplicates and
+    identity constants dropped, and the whole is folded to a constant if
+    an operand is the absorbing constant or is the negation of another.
+    """
+    identity, absorbing = (TRUE, FALSE) if cls is And else (FALSE, TRUE)
+    children = []
+    seen = set()
+    for operand in operands:
+        nested = operand.children() if type(operand) is cls else (operand,)
+        for child in nested:
+            if child is absorbing:
+                return absorbing
+            if child is not identity and child not in seen:
+                seen.add(child)
+                children.append(child)
+    for child in children:
+        if isinstance(child, Not) and child.operand in seen:
+            return absorbing
+    if not children:
+        return identity
+    return children[0] if len(children) == 1 else cls(*children)
+
+
+def fold_node(sentence, operands, facts):
+    """Simplifies one node whose children are already simplified."""
+    if isinstance(sentence, Symbol):
+        if sentence.name in facts:
+            return Constant(facts[sentence.name])
+        return sentence
+    elif isinstance(sentence, Constant):
+        return sentence
+    elif isinstance(sentence, Not):
+        return negate(operands[0])
+    elif isinstance(sentence, (And, Or)):
+        return junction(type(sentence), operands)
+    elif isinstance(sentence, Implication):
+        antecedent, consequent = operands
+        if antecedent is FALSE or consequent is TRUE or (
+            antecedent is consequent
+            or isinstance(consequent, Or) and antecedent in
+            consequent.disjuncts
+            or isinstance(antecedent, And) and consequent in
+            antecedent.conjuncts
+        ):
+            return TRUE
+        if antecedent is TRUE:
+            return consequent
+        if consequent is FALSE:
+            return negate(antecedent)
+        return Implication(antecedent, consequent)
+    elif isinstance(sentence, Biconditional):
+        left, right = operands
+        if left is right:
+            return TRUE
+        if left is negate(right):
+            return FALSE
+        if isinstance(left, Constant):
+            return right if left.value else negate(right)
+        if isinstance(right, Constant):
+            return left if right.value else negate(left)
+        return Biconditional(left, right)
+    raise TypeError(f"cannot simplify {type(sentence).__name__}")
+
+
+def fold(sentence, facts):
+    """Simplifies sentence, with the symbols in facts as constants.
+
+    Works bottom-up with an explicit stack, so deeply nested sentences
+    cannot overflow the recursion limit.
+    """
+    results = {}
+    stack = [(sentence, False)]
+    while stack:
+        node, children_done = stack.pop()
+        if node in results:
+            continue
+        children = node.children()
+        if children and not children_done:
+            stack.append((node, True))
+            stack.extend((child, False) for child in children)
+            continue
+        results[node] = fold_node(
+            node, [results[child] for child in children], facts
+        )
+    return results[sentence]
+
+
+def unit_facts(sentence, facts=None):
+    """Propagates the facts that sentence states outright.
+
+    Symbols and negated symbols among the top-level conjuncts are facts;
+    each is substituted into the rest of the sentence, which may turn
+    other conjuncts into facts, until none are left. Returns (facts,
+    rest): facts maps symbol names to the values they are forced to,
+    including any starting facts, and rest is the remainder of the
+    sentence, which mentions none of them. The sentence is equivalent to
+    rest together with the facts, and is FALSE where rest is. Without
+    starting facts, the result is kept on the sentence for reuse.
+    """
+    if facts is None:
+        if sentence._facts is None:
+            object.__setattr__(sentence, "_facts", unit_facts(sentence, {}))
+        facts, rest = sentence._facts
+        return dict(facts), rest
+    facts = dict(facts)
+    rest = fold(sentence, facts)
+    while True:
+        units = {}
+        for conjunct in rest.conjuncts if isinstance(rest, And) else (rest,):
+            if isinstance(conjunct, Symbol):
+                units[conjunct.name] = True
+            elif isinstance(conjunct, Not) and isinstance(conjunct.operand,
+                                                          Symbol):
+                units[conjunct.operand.name] = False
+        if not units:
+            return facts, rest
+        facts.update(units)
+        rest = fold(rest, facts)
+
+
+def simplify(sentence):
+    """Returns a smaller sentence equivalent to sentence.
+
+    Nested conjunctions and disjunctions are flattened, duplicates
+    removed, tautologies and contradictions folded to TRUE and FALSE,
+    and the facts the sentence states outright propagated through it.
+    """
+    facts, rest = unit_facts(sentence)
+    if rest is FALSE:
+        return FALSE
+    return junction(And, [
+        Symbol(name) if value else Not(Symbol(name))
+        for name, value in facts.items()
+    ] + [rest])
+
+
+def model_check(knowledge, query, method="enumerate", processes=None):
+    """Checks if knowledge base entails query.
+
+    With method="enumerate" knowledge and query are compiled and called
+    on every model in turn; method="evaluate" instead walks the sentence
+    trees over a model dictionary; with method="bitset" the models are
+    evaluated many at a time over bit-packed truth table columns (see
+    model_check_bitset); method="parallel" splits the enumeration across
+    `processes` worker processes (see model_check_parallel).
+    """
+    if method != "evaluate":
+        # Knowledge entails query exactly when the rest of the knowledge,
+        # once its facts are propagated, entails what the facts leave of
+        # the query; the rest mentions none of the facts' symbols
+        facts, knowledge = unit_facts(knowledge)
+        query = fold(query, facts)
+
+    if method == "enumerate":
+        return model_check_compiled(knowledge, query)
+    elif method == "bitset":
+        return model_check_bitset(knowledge, query)
+    elif method == "parallel":
+        return model_check_parallel(knowledge, query, processes)
+    elif method != "evaluate":
+        raise ValueError(f"unknown model checking method {method!r}")
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
@@ -257,7 +588,554 @@ def model_check(knowledge, query):
                     check_all(knowledge, query, remaining, model_false))
 
     # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+    symbols = set(knowledge.symbols() | query.symbols())
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+def model_check_compiled(knowledge, query):
+    """Checks if knowledge base entails query with compiled sentences."""
+    symbols = sorted(knowledge.symbols() | query.symbols())
+    knowledge_true = knowledge.compile(symbols)
+    query_true = query.compile(symbols)
+    for values in itertools.product((True, False), repeat=len(symbols)):
+        if knowledge_true(values) and not query_true(values):
+            return False
+    return True
+
+
+# Models a parallel model checking worker enumerates between checks for
+# cancellation
+CANCEL_CHECK_INTERVAL = 1 << 12
+
+# Parallel model checking aims for this many subproblems per process, so
+# that uneven subproblems still keep every process busy
+TASKS_PER_PROCESS = 8
+
+# Compiled knowledge and query of a parallel model checking worker, and
+# the event that cancels its remaining work, set by init_worker
+worker_state = None
+
+
+def init_worker(knowledge, query, symbols, cancelled):
+    """Compiles knowledge and query in a model checking worker process."""
+    global worker_state
+    worker_state = (knowledge.compile(symbols), query.compile(symbols),
+                    len(symbols), cancelled)
+
+
+def check_prefix(prefix, split_bits):
+    """Checks entailment over the models whose first symbols are fixed.
+
+    The first split_bits symbols take their values from the bits of
+    prefix, and every assignment to the others is checked. Returns False
+    if one is a counter-model, True if none is, and None if the check was
+    cancelled first.
+    """
+    knowledge_true, query_true, count, cancelled = worker_state
+    fixed = [(bool(prefix >> i & 1),) for i in range(split_bits)]
+    free = count - split_bits
+    models = itertools.product(*fixed, *[(True, False)] * free)
+    for _ in range(0, 1 << free, CANCEL_CHECK_INTERVAL):
+        if cancelled.is_set():
+            return None
+        for values in itertools.islice(models, CANCEL_CHECK_INTERVAL):
+            if knowledge_true(values) and not query_true(values):
+                cancelled.set()
+                return False
+    return True
+
+
+def model_check_parallel(knowledge, query, processes=None, split_bits=None):
+    """Checks if knowledge base entails query across worker processes.
+
+    The models are split into 2^split_bits subproblems by fixing the
+    first split_bits symbols, and each subproblem is enumerated with
+    compiled sentences in a process pool. As soon as any worker finds a
+    counter-model, a shared event stops the others and subproblems not
+    yet started are cancelled.
+    """
+    symbols = sorted(knowledge.symbols() | query.symbols())
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if split_bits is None:
+        split_bits = math.ceil(math.log2(processes * TASKS_PER_PROCESS))
+    split_bits = min(split_bits, len(symbols))
+
+    cancelled = multiprocessing.Event()
+    with ProcessPoolExecutor(processes, initializer=init_worker,
+                             initargs=(knowledge, query, symbols,
+                                       cancelled)) as executor:
+        pending = {executor.submit(check_prefix, prefix, split_bits)
+                   for prefix in range(1 << split_bits)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            if any(future.result() is False for future in done):
+                cancelled.set()
+                for future in pending:
+                    future.cancel()
+                return False
+    return True
+
+
+# Number of models evaluated at once by bitset model checking, as a
+# power of two
+TRUTH_TABLE_CHUNK_BITS = 16
+
+
+def truth_table_program(sentence, positions):
+    """Compiles a sentence into a flat list of bitwise instructions.
+
+    Each instruction is (operation, operands) and computes one register;
+    operands are symbol positions for "symbol" and earlier registers
+    otherwise. Shared subsentences are compiled once. The last
+    instruction computes the whole sentence.
+    """
+    program = []
+    registers = {}
+    stack = [(sentence, False)]
+    while stack:
+        node, children_done = stack.pop()
+        if id(node) in registers:
+            continue
+        if isinstance(node, Symbol):
+            instruction = ("symbol", (positions[node.name],))
+        elif isinstance(node, Constant):
+            instruction = ("constant", (node.value,))
+        else:
+            if isinstance(node, Not):
+                operation, children = "not", (node.operand,)
+            elif isinstance(node, And):
+                operation, children = "and", node.conjuncts
+            elif isinstance(node, Or):
+                operation, children = "or", node.disjuncts
+            elif isinstance(node, Implication):
+                operation, children = "implies", (node.antecedent,
+                                                  node.consequent)
+            elif isinstance(node, Biconditional):
+                operation, children = "iff", (node.left, node.right)
+            else:
+                raise TypeError(f"cannot compile {type(node).__name__}")
+            if not children_done:
+                stack.append((node, True))
+                stack.extend((child, False) for child in children)
+                continue
+            instruction = (operation,
+                           tuple(registers[id(child)] for child in children))
+        registers[id(node)] = len(program)
+        program.append(instruction)
+    return program
+
+
+def run_truth_table(program, columns, mask):
+    """Runs a truth table program over bit-packed symbol columns.
+
+    Bit m of the result is the value of the sentence in model m.
+    """
+    values = []
+    for operation, operands in program:
+        if operation == "symbol":
+            value = columns[operands[0]]
+        elif operation == "constant":
+            value = mask if operands[0] else 0
+        elif operation == "not":
+            value = mask ^ values[operands[0]]
+        elif operation == "and":
+            value = mask
+            for operand in operands:
+                value &= values[operand]
+        elif operation == "or":
+            value = 0
+            for operand in operands:
+                value |= values[operand]
+        elif operation == "implies":
+            value = (mask ^ values[operands[0]]) | values[operands[1]]
+        else:
+            value = mask ^ (values[operands[0]] ^ values[operands[1]])
+        values.append(value)
+    return values[-1]
+
+
+def model_check_bitset(knowledge, query, chunk_bits=TRUTH_TABLE_CHUNK_BITS):
+    """Checks if knowledge base entails query, a chunk of models at a time.
+
+    The 2^n models are split into chunks of 2^chunk_bits. Within a chunk,
+    the low symbols vary from model to model, so each is a fixed
+    alternating bit pattern, and the others are constant, so each is all
+    ones or all zeros; knowledge and query are then evaluated for the
+    whole chunk with a few big-integer operations per node. Only one
+    chunk is held in memory at a time.
+    """
+    symbols = sorted(knowledge.symbols() | query.symbols())
+    positions = {name: i for i, name in enumerate(symbols)}
+    knowledge_program = truth_table_program(knowledge, positions)
+    query_program = truth_table_program(query, positions)
+
+    low = min(len(symbols), chunk_bits)
+    size = 1 << low
+    mask = (1 << size) - 1
+
+    # Pattern of symbol j < low: runs of 2^j zeros then 2^j ones
+    patterns = []
+    for j in range(low):
+        run = 1 << j
+        block = ((1 << run) - 1) << run
+        patterns.append(block * (mask // ((1 << (2 * run)) - 1)))
+
+    for chunk in range(1 << (len(symbols) - low)):
+        columns = patterns + [
+            mask if chunk >> (j - low) & 1 else 0
+            for j in range(low, len(symbols))
+        ]
+        knowledge_true = run_truth_table(knowledge_program, columns, mask)
+        if knowledge_true & ~run_truth_table(query_program, columns, mask):
+            return False
+    return True
+
+
+class CNFEncoder():
+    """Tseitin-encodes sentences into clauses of a sat.Solver.
+
+    Every symbol becomes a solver variable, and every compound
+    subsentence gets a fresh variable constrained to be equivalent to
+    it, so the clauses grow linearly with the sentence. Encodings are
+    remembered, so a sentence that is used again, or encoded again, does
+    not add new clauses.
+    """
+
+    def __init__(self, solver=None):
+        self.solver = sat.Solver() if solver is None else solver
+        self.variables = {}
+        self.definitions = {}
+        self.true = None
+
+    def variable(self, name):
+        """Returns the solver variable for the symbol called `name`."""
+        if name not in self.variables:
+            self.variables[name] = self.solver.new_var()
+        return self.variables[name]
+
+    def literal(self, sentence):
+        """Returns a solver literal equivalent to `sentence`."""
+        # Walk the sentence in post-order with an explicit stack, so that
+        # deeply nested sentences cannot overflow the recursion limit
+        stack = [(sentence, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if node in self.definitions:
+                continue
+            children = self.children(node)
+            if not children_done and children:
+                stack.append((node, True))
+                stack.extend((child, False) for child in children)
+                continue
+            self.definitions[node] = self.define(node)
+        return self.definitions[sentence]
+
+    def children(self, sentence):
+        if isinstance(sentence, (Symbol, Constant)):
+            return ()
+        elif isinstance(sentence, Not):
+            return (sentence.operand,)
+        elif isinstance(sentence, And):
+            return tuple(sentence.conjuncts)
+        elif isinstance(sentence, Or):
+            return tuple(sentence.disjuncts)
+        elif isinstance(sentence, Implication):
+            return (sentence.antecedent, sentence.consequent)
+        elif isinstance(sentence, Biconditional):
+            return (sentence.left, sentence.right)
+        raise TypeError(f"cannot encode {type(sentence).__name__}")
+
+    def define(self, sentence):
+        """Returns a literal for `sentence`, whose children are encoded."""
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Constant):
+            # One variable, asserted true, stands for both constants
+            if self.true is None:
+                self.true = self.solver.new_var()
+                self.solver.add_clause([self.true])
+            return self.true if sentence.value else -self.true
+        children = [self.definitions[child]
+                    for child in self.children(sentence)]
+        if isinstance(sentence, Not):
+            return -children[0]
+        if isinstance(sentence, (And, Or)) and len(children) == 1:
+            return children[0]
+
+        add = self.solver.add_clause
+        x = self.solver.new_var()
+        if isinstance(sentence, And):
+            # x <=> (c1 and ... and cn)
+            for child in children:
+                add([-x, child])
+            add([x] + [-child for child in children])
+        elif isinstance(sentence, Or):
+            # x <=> (c1 or ... or cn)
+            for child in children:
+                add([x, -child])
+            add([-x] + children)
+        elif isinstance(sentence, Implication):
+            # x <=> (not a or b)
+            a, b = children
+            add([-x, -a, b])
+            add([x, a])
+            add([x, -b])
+        else:
+            # x <=> (a <=> b)
+            a, b = children
+            add([-x, -a, b])
+            add([-x, a, -b])
+            add([x, a, b])
+            add([x, -a, -b])
+        return x
+
+    def add(self, sentence):
+        """Asserts that `sentence` is true."""
+        # Conjunctions are split and disjunctions become single clauses,
+        # to avoid defining variables that would just be forced true
+        stack = [sentence]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, And):
+                stack.extend(node.conjuncts)
+            elif isinstance(node, Or) and node.disjuncts:
+                self.solver.add_clause(
+                    [self.literal(disjunct) for disjunct in node.disjuncts])
+            else:
+                self.solver.add_clause([self.literal(node)])
+
+
+def entails(knowledge, query):
+    """Checks if knowledge base entails query, using a SAT solver.
+
+    Gives the same answers as model_check: the knowledge entails the
+    query exactly when knowledge together with the negated query has no
+    model, which the solver decides without enumerating every model.
+    """
+    facts, knowledge = unit_facts(knowledge)
+    encoder = CNFEncoder()
+    encoder.add(knowledge)
+    return not encoder.solver.solve([-encoder.literal(fold(query, facts))])
+
+
+class KnowledgeBase():
+    """A knowledge base that answers many entailment queries incrementally.
+
+    Sentences are Tseitin-encoded into one sat.Solver as they are added,
+    and every query is a solver call that assumes the query is false, so
+    clauses learned and facts propagated for one query are reused by the
+    next. Answers are remembered until the knowledge base changes; adding
+    knowledge never retracts an entailment, so only negative answers are
+    forgotten then.
+    """
+
+    def __init__(self, *sentences):
+        self.encoder = CNFEncoder()
+        self.sentences = []
+        self.answers = {}
+        for sentence in sentences:
+            self.add(sentence)
+
+    def add(self, sentence):
+        """Adds a sentence to the knowledge base."""
+        Sentence.validate(sentence)
+        self.sentences.append(sentence)
+        self.encoder.add(simplify(sentence))
+        self.answers = {query: answer
+                        for query, answer in self.answers.items() if answer}
+
+    def knowledge(self):
+        """Returns the conjunction of every sentence added so far."""
+        return And(*self.sentences)
+
+    def consistent(self):
+        """Checks if the knowledge base has a model."""
+        return self.encoder.solver.solve()
+
+    def entails(self, query):
+        """Checks if the knowledge base entails query."""
+        Sentence.validate(query)
+        if query not in self.answers:
+            literal = self.encoder.literal(query)
+            self.answers[query] = not self.encoder.solver.solve([-literal])
+        return self.answers[query]
+
+    def ask(self, query):
+        """Returns what the knowledge base says about query.
+
+        True if it entails query, False if it entails the negation of
+        query, and None if it does not decide query either way.
+        """
+        if self.entails(query):
+            return True
+        if self.entails(Not(query)):
+            return False
+        return None
+
+
+class ClauseList():
+    """Collects the clauses of a CNFEncoder without solving them.
+
+    Has the new_var/add_clause interface of sat.Solver, for encoders
+    whose clauses are processed some other way, as in count_models.
+    """
+
+    def __init__(self):
+        self.num_vars = 0
+        self.clauses = []
+
+    def new_var(self):
+        self.num_vars += 1
+        return self.num_vars
+
+    def add_clause(self, literals):
+        self.clauses.append(frozenset(literals))
+        return True
+
+
+def count_models(sentence, symbols=()):
+    """Returns the number of models of sentence.
+
+    Models range over the symbols of sentence together with the names in
+    symbols, which are free if sentence does not mention them. The
+    sentence is Tseitin-encoded and counted by branching on its symbols
+    with unit propagation; after each branch the remaining clauses are
+    split into independent components, whose counts multiply, and counts
+    are cached by component so that repeated subproblems are counted once.
+    """
+    encoder = CNFEncoder(ClauseList())
+    encoder.add(sentence)
+    names = sentence.symbols() | set(symbols)
+    for name in names:
+        encoder.variable(name)
+
+    # Branching is only on symbol variables: every other variable
+    # stands for a subsentence, so propagation fixes it once its
+    # symbols are fixed, and it never adds models of its own
+    counter = ModelCounter(set(encoder.variables.values()))
+    return counter.count(frozenset(encoder.solver.clauses),
+                         frozenset(encoder.variables.values()))
+
+
+class ModelCounter():
+    """Counts the models of clauses over a set of branching variables."""
+
+    def __init__(self, branching):
+        self.branching = branching
+        self.cache = {}
+
+    def count(self, clauses, variables):
+        """Returns the number of assignments to variables satisfying clauses.
+
+        Every variable in clauses that is not in variables must be fixed
+        by the others through propagation.
+        """
+        clauses, assigned = propagate_units(clauses)
+        if clauses is None:
+            return 0
+        mentioned = {abs(literal) for clause in clauses for literal in clause}
+        free = len(variables - assigned - mentioned)
+        total = 2 ** free
+        for component in split_components(clauses):
+            total *= self.count_component(component)
+            if not total:
+                break
+        return total
+
+    def count_component(self, clauses):
+        """Returns the number of models of connected clauses.
+
+        Models range over the branching variables the clauses mention.
+        """
+        if clauses in self.cache:
+            return self.cache[clauses]
+        occurrences = {}
+        for clause in clauses:
+            for literal in clause:
+                variable = abs(literal)
+                occurrences[variable] = occurrences.get(variable, 0) + 1
+        variables = frozenset(occurrences) & self.branching
+        if variables:
+            variable = max(variables, key=occurrences.__getitem__)
+        else:
+            variable = max(occurrences, key=occurrences.__getitem__)
+        rest = variables - {variable}
+        total = (self.count(condition(clauses, variable), rest)
+                 + self.count(condition(clauses, -variable), rest))
+        self.cache[clauses] = total
+        return total
+
+
+def condition(clauses, literal):
+    """Returns clauses simplified by making literal true."""
+    return frozenset(clause - {-literal} for clause in clauses
+                     if literal not in clause)
+
+
+def propagate_units(clauses):
+    """Applies unit propagation to clauses.
+
+    Returns (clauses, assigned) with the simplified clauses and the set of
+    variables assigned on the way, or (None, None) on a conflict.
+    """
+    assigned = set()
+    while True:
+        if frozenset() in clauses:
+            return None, None
+        units = {next(iter(clause)) for clause in clauses if len(clause) == 1}
+        if not units:
+            return clauses, assigned
+        if any(-unit in units for unit in units):
+            return None, None
+        assigned.update(abs(unit) for unit in units)
+        clauses = frozenset(clause - {-unit for unit in units}
+                            for clause in clauses if not clause & units)
+
+
+def split_components(clauses):
+    """Splits clauses into groups that share no variables."""
+    parent = {}
+
+    def find(variable):
+        while parent[variable] != variable:
+            parent[variable] = parent[parent[variable]]
+            variable = parent[variable]
+        return variable
+
+    for clause in clauses:
+        roots = []
+        for literal in clause:
+            parent.setdefault(abs(literal), abs(literal))
+            roots.append(find(abs(literal)))
+        for root in roots[1:]:
+            parent[find(root)] = find(roots[0])
+
+    components = {}
+    for clause in clauses:
+        root = find(abs(next(iter(clause))))
+        components.setdefault(root, []).append(clause)
+    return [frozenset(component) for component in components.values()]
+
+
+def iter_models(sentence, symbols=()):
+    """Yields every model of sentence, one at a time.
+
+    Each model is a dict from name to truth value, over the symbols of
+    sentence together with the names in symbols. Models come from a SAT
+    solver, with a clause excluding each one added after it is yielded,
+    so the first model is available without enumerating the others.
+    """
+    encoder = CNFEncoder()
+    encoder.add(sentence)
+    names = sorted(sentence.symbols() | set(symbols))
+    variables = [encoder.variable(name) for name in names]
+    solver = encoder.solver
+    while solver.solve():
+        model = {name: solver.model[variable] > 0
+                 for name, variable in zip(names, variables)}
+        yield model
+        solver.add_clause([-variable if model[name] else variable
+                           for name, variable in zip(names, variables)])
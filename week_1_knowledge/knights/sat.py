@@ -0,0 +1,343 @@
+"""
+Conflict-driven clause learning (CDCL) SAT solver.
+
+Clauses are lists of non-zero ints in DIMACS style: variable v is the
+literal v, and its negation is -v. The solver uses two watched literals
+per clause for unit propagation, learns a first-UIP clause from every
+conflict and backjumps non-chronologically, picks decisions by variable
+activity (VSIDS) with phase saving, and restarts on a geometric schedule.
+
+Clauses can be added between calls to solve, and solve accepts
+assumptions (literals that must hold for that call only), so one solver
+can answer many related queries while keeping what it has learned.
+"""
+
+import heapq
+
+# Growth factor of the conflict budget between restarts
+RESTART_GROWTH = 1.5
+FIRST_RESTART = 100
+
+# Activity decay, as the factor the bump grows by after each conflict
+ACTIVITY_DECAY = 0.95
+ACTIVITY_LIMIT = 1e100
+
+
+class Solver():
+
+    def __init__(self):
+        self.num_vars = 0
+
+        # Per variable (index 0 unused): value (1 true, -1 false, 0 unset),
+        # decision level and reason clause of the assignment, saved phase
+        # and activity
+        self.values = [0]
+        self.levels = [0]
+        self.reasons = [None]
+        self.phases = [-1]
+        self.activity = [0.0]
+
+        # Clauses watching each literal, keyed by the literal
+        self.watches = {}
+
+        # Assigned literals in order, where each decision level starts in
+        # the trail, and how far propagation has got
+        self.trail = []
+        self.trail_limits = []
+        self.propagated = 0
+
+        # Unassigned variable candidates, as (-activity, variable)
+        self.order = []
+        self.bump = 1.0
+
+        self.clauses = []
+        self.learned = []
+
+        # False once the clauses are unsatisfiable without assumptions
+        self.ok = True
+
+        # Values of every variable in the last satisfying assignment
+        self.model = None
+
+        # Running totals, for diagnostics
+        self.stats = {"decisions": 0, "propagations": 0, "conflicts": 0,
+                      "restarts": 0}
+
+    def new_var(self):
+        """
+        Returns a new variable.
+        """
+        self.num_vars += 1
+        self.values.append(0)
+        self.levels.append(0)
+        self.reasons.append(None)
+        self.phases.append(-1)
+        self.activity.append(0.0)
+        self.watches[self.num_vars] = []
+        self.watches[-self.num_vars] = []
+        heapq.heappush(self.order, (0.0, self.num_vars))
+        return self.num_vars
+
+    def ensure_vars(self, count):
+        """
+        Creates variables until there are at least `count`.
+        """
+        while self.num_vars < count:
+            self.new_var()
+
+    def value(self, literal):
+        """
+        Returns 1 if `literal` is true, -1 if false and 0 if unassigned.
+        """
+        value = self.values[abs(literal)]
+        return value if literal > 0 else -value
+
+    def add_clause(self, literals):
+        """
+        Adds a clause. Returns False if the clauses have become
+        unsatisfiable.
+        """
+        if not self.ok:
+            return False
+        self.backtrack(0)
+
+        clause = []
+        for literal in literals:
+            if not literal:
+                raise ValueError("0 is not a literal")
+            self.ensure_vars(abs(literal))
+            value = self.value(literal)
+            if value == 1 or -literal in clause:
+                return True
+            if value == 0 and literal not in clause:
+                clause.append(literal)
+
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self.assign(clause[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.clauses.append(clause)
+            self.watch(clause)
+        return self.ok
+
+    def watch(self, clause):
+        self.watches[clause[0]].append(clause)
+        self.watches[clause[1]].append(clause)
+
+    def assign(self, literal, reason):
+        variable = abs(literal)
+        self.values[variable] = 1 if literal > 0 else -1
+        self.levels[variable] = len(self.trail_limits)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Assigns every literal forced by unit clauses.
+
+        Returns a conflicting clause, or None if there is no conflict.
+        """
+        values = self.values
+        while self.propagated < len(self.trail):
+            false_literal = -self.trail[self.propagated]
+            self.propagated += 1
+            self.stats["propagations"] += 1
+
+            watchers = self.watches[false_literal]
+            self.watches[false_literal] = kept = []
+            conflict = None
+            for position, clause in enumerate(watchers):
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                first = clause[0]
+                first_value = values[abs(first)]
+                if first < 0:
+                    first_value = -first_value
+                if first_value == 1:
+                    kept.append(clause)
+                    continue
+
+                # Look for another literal that is not false to watch
+                for i in range(2, len(clause)):
+                    literal = clause[i]
+                    value = values[abs(literal)]
+                    if (value if literal > 0 else -value) != -1:
+                        clause[1], clause[i] = literal, false_literal
+                        self.watches[literal].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if first_value == -1:
+                        conflict = clause
+                        kept.extend(watchers[position + 1:])
+                        break
+                    self.assign(first, clause)
+
+            if conflict is not None:
+                self.propagated = len(self.trail)
+                return conflict
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns (learned clause, level to backjump to) for a conflict.
+
+        The learned clause is the first unique implication point cut; its
+        first literal is the one that becomes unit after backjumping.
+        """
+        level = len(self.trail_limits)
+        learned = [0]
+        seen = set()
+        pending = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = conflict
+
+        while True:
+            for other in clause:
+                variable = abs(other)
+                if other == literal or variable in seen:
+                    continue
+                if self.levels[variable] == 0:
+                    continue
+                seen.add(variable)
+                self.bump_activity(variable)
+                if self.levels[variable] == level:
+                    pending += 1
+                else:
+                    learned.append(other)
+
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.reasons[abs(literal)]
+
+        learned[0] = -literal
+        backjump = 0
+        if len(learned) > 1:
+            # Watch the literal from the highest remaining level second
+            deepest = max(range(1, len(learned)),
+                          key=lambda i: self.levels[abs(learned[i])])
+            learned[1], learned[deepest] = learned[deepest], learned[1]
+            backjump = self.levels[abs(learned[1])]
+        return learned, backjump
+
+    def bump_activity(self, variable):
+        self.activity[variable] += self.bump
+        if self.activity[variable] > ACTIVITY_LIMIT:
+            self.activity = [activity / ACTIVITY_LIMIT
+                             for activity in self.activity]
+            self.bump /= ACTIVITY_LIMIT
+            self.order = [(-self.activity[v], v)
+                          for v in range(1, self.num_vars + 1)
+                          if self.values[v] == 0]
+            heapq.heapify(self.order)
+        elif self.values[variable] == 0:
+            heapq.heappush(self.order,
+                           (-self.activity[variable], variable))
+
+    def backtrack(self, level):
+        """
+        Undoes every assignment above decision level `level`.
+        """
+        if len(self.trail_limits) <= level:
+            return
+        start = self.trail_limits[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.phases[variable] = self.values[variable]
+            self.values[variable] = 0
+            self.reasons[variable] = None
+            heapq.heappush(self.order, (-self.activity[variable], variable))
+        del self.trail[start:]
+        del self.trail_limits[level:]
+        self.propagated = len(self.trail)
+
+    def pick_branch(self):
+        """
+        Returns the most active unassigned variable, or None.
+        """
+        while self.order:
+            negative_activity, variable = heapq.heappop(self.order)
+            if (self.values[variable] == 0
+                    and -negative_activity == self.activity[variable]):
+                return variable
+        # Entries can go stale; fall back to a scan
+        for variable in range(1, self.num_vars + 1):
+            if self.values[variable] == 0:
+                return variable
+        return None
+
+    def solve(self, assumptions=()):
+        """
+        Returns True if the clauses, together with the `assumptions`
+        literals, are satisfiable.
+
+        On success, `model` holds the value of every variable. The solver
+        is back at decision level 0 afterwards, ready for more clauses.
+        """
+        self.model = None
+        if not self.ok:
+            return False
+        for literal in assumptions:
+            self.ensure_vars(abs(literal))
+        self.backtrack(0)
+        if self.propagate() is not None:
+            self.ok = False
+            return False
+
+        budget = FIRST_RESTART
+        conflicts = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.stats["conflicts"] += 1
+                conflicts += 1
+                if not self.trail_limits:
+                    self.ok = False
+                    return False
+                learned, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.learned.append(learned)
+                    self.watch(learned)
+                    self.assign(learned[0], learned)
+                self.bump /= ACTIVITY_DECAY
+                continue
+
+            if conflicts >= budget:
+                self.stats["restarts"] += 1
+                conflicts = 0
+                budget = int(budget * RESTART_GROWTH)
+                self.backtrack(0)
+                continue
+
+            # Assumptions are decided first, one level each
+            level = len(self.trail_limits)
+            if level < len(assumptions):
+                literal = assumptions[level]
+                value = self.value(literal)
+                if value == -1:
+                    self.backtrack(0)
+                    return False
+                self.trail_limits.append(len(self.trail))
+                if value == 0:
+                    self.assign(literal, None)
+                continue
+
+            variable = self.pick_branch()
+            if variable is None:
+                self.model = list(self.values)
+                self.backtrack(0)
+                return True
+            self.stats["decisions"] += 1
+            self.trail_limits.append(len(self.trail))
+            self.assign(variable * self.phases[variable], None)